@@ -4,27 +4,32 @@ Estonian Registry CLI - High Performance, Beautiful & Exhaustive
 """
 
 import argparse
+import codecs
 import csv
 import json
 import os
 import shutil
-import subprocess
 import time
-import urllib.request
-import zipfile
 import io
 import re
 import sqlite3
 import sys
 from pathlib import Path
-from threading import Thread, Lock
-from pypdf import PdfReader
-from collections import defaultdict
 from datetime import datetime
 import logging
 from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
 
 from difflib import get_close_matches
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+
+try:
+    import orjson  # optional: faster JSON encode/decode for merges, search and --json output
+except ImportError:
+    orjson = None
 
 from rich.console import Console
 from rich.table import Table
@@ -33,7 +38,6 @@ from rich.text import Text
 from rich.tree import Tree
 from rich.columns import Columns
 from rich.theme import Theme
-from rich.syntax import Syntax
 from rich import box
 
 # ============================================================
@@ -246,6 +250,11 @@ INDUSTRY_MAP = {
     "ngo": ["9412", "9499"], "nonprofit": ["9412", "9499"],
 }
 
+@lru_cache(maxsize=256)
+def _industry_suggestions(key):
+    # difflib scores every INDUSTRY_MAP key; the warnings stay in resolve_industry so repeats still print
+    return tuple(get_close_matches(key, INDUSTRY_MAP.keys(), n=3, cutoff=0.6))
+
 def resolve_industry(name):
     """Resolve an industry name or EMTAK code to a list of EMTAK prefixes."""
     if not name:
@@ -257,8 +266,7 @@ def resolve_industry(name):
     key = name.lower()
     if key in INDUSTRY_MAP:
         return INDUSTRY_MAP[key]
-    # Try close matches
-    matches = get_close_matches(key, INDUSTRY_MAP.keys(), n=3, cutoff=0.6)
+    matches = _industry_suggestions(key)
     if matches:
         console.print(f"[warning]Unknown industry '{name}'. Did you mean: {', '.join(matches)}?[/warning]")
         return None
@@ -282,6 +290,7 @@ UI_LABELS = {
         "analysis_title": "Analüüs", "rank": "Nr", "group": "Grupp", "count": "Arv", "pct": "Osakaal",
         "analysis_by": {"county": "maakond", "status": "staatus", "legal-form": "õiguslik vorm", "emtak": "EMTAK kood", "year": "asutamisaasta",
                         "capital-range": "kapitalivahemik", "employee-range": "tootajate vahemik", "role": "roll", "country": "riik"},
+        "person_sources": {"board": "Juhatuse liige", "shareholder": "Osanik", "beneficiary": "Kasusaaja"},
     },
     "en": {
         "dossier": "Dossier", "core": "Core Identity", "enrichment": "Live PDF Enrichment", "general": "General Attributes",
@@ -299,28 +308,211 @@ UI_LABELS = {
         "analysis_title": "Analysis", "rank": "Rank", "group": "Group", "count": "Count", "pct": "Share",
         "analysis_by": {"county": "County", "status": "Status", "legal-form": "Legal Form", "emtak": "EMTAK Code", "year": "Founding Year",
                         "capital-range": "Capital Range", "employee-range": "Employee Range", "role": "Person Role", "country": "Beneficiary Country"},
+        "person_sources": {"board": "Board Member", "shareholder": "Shareholder", "beneficiary": "Beneficiary"},
     }
 }
 
+UI_ET, UI_EN = UI_LABELS["et"], UI_LABELS["en"]
+
 def translate_value(val, to_en=False):
     if not to_en or not isinstance(val, str): return val
-    if val in VALUE_TRANSLATIONS: return f"{VALUE_TRANSLATIONS[val]} ({val})"
-    if ", " in val:
-        parts = [VALUE_TRANSLATIONS.get(p.strip(), p.strip()) for p in val.split(",")]
-        if any(p in VALUE_TRANSLATIONS for p in [x.strip() for x in val.split(",")]): return f"{', '.join(parts)} ({val})"
+    return _translate_str(val)
+
+# Exact-match values, joined into their "English (Estonian)" form once at import
+_VALUE_EN = {et: f"{en} ({et})" for et, en in VALUE_TRANSLATIONS.items()}
+
+def _translate_str(val):
+    hit = _VALUE_EN.get(val)
+    if hit is not None: return hit
+    return _translate_joined(val) if ", " in val else val
+
+@lru_cache(maxsize=1 << 16)
+def _translate_joined(val):
+    # Comma-joined roles/activities repeat across thousands of rows; split each distinct combination once.
+    # Only these are cached, so unique names and addresses never evict them
+    parts = [p.strip() for p in val.split(",")]
+    if any(p in VALUE_TRANSLATIONS for p in parts): return f"{', '.join([VALUE_TRANSLATIONS.get(p, p) for p in parts])} ({val})"
     return val
 
+def _untranslated_key(k, default=None): return k
+
+def tr_fn(to_en):
+    """Key translator specialized once per call site: tr(k, k) -> English key name, or k itself for Estonian."""
+    return TRANSLATIONS.get if to_en else _untranslated_key
+
+def _value_en(v): return _translate_str(v) if isinstance(v, str) else v
+def _untranslated_value(v): return v
+
+def tv_fn(to_en):
+    """Value translator specialized once per call site: tv(v) == translate_value(v, to_en)."""
+    return _value_en if to_en else _untranslated_value
+
 def translate_item(item, to_en=False):
+    """Translate keys and string values to English in place; returns item (fresh search rows, never shared)."""
     if not to_en: return item
-    if isinstance(item, list): return [translate_item(i, True) for i in item]
-    if isinstance(item, dict): return {TRANSLATIONS.get(k, k): translate_item(v, True) for k, v in item.items()}
-    if isinstance(item, str): return translate_value(item, True)
+    if isinstance(item, str): return _translate_str(item)
+    tget, tval, stack = TRANSLATIONS.get, _translate_str, [item]
+    while stack:
+        n = stack.pop(); tn = type(n)
+        if tn is dict:
+            pairs = list(n.items()); n.clear()
+            for k, v in pairs:
+                tv = type(v)
+                if tv is str: v = tval(v)
+                elif tv is dict or tv is list: stack.append(v)
+                n[tget(k, k)] = v
+        elif tn is list:
+            for i, v in enumerate(n):
+                tv = type(v)
+                if tv is str: n[i] = tval(v)
+                elif tv is dict or tv is list: stack.append(v)
     return item
 
 # ============================================================
 # Database Interfaces & Backends
 # ============================================================
 
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS companies (
+        code INTEGER PRIMARY KEY, name TEXT, status TEXT, maakond TEXT, linn TEXT,
+        legal_form TEXT, founded_at TEXT, full_data JSON DEFAULT '{}', enrichment JSON
+    );
+    CREATE TABLE IF NOT EXISTS sync_state (filename TEXT PRIMARY KEY, status TEXT);
+    CREATE INDEX IF NOT EXISTS idx_name ON companies(name);
+    CREATE INDEX IF NOT EXISTS idx_legal_form ON companies(legal_form);
+    CREATE INDEX IF NOT EXISTS idx_status ON companies(status);
+    CREATE INDEX IF NOT EXISTS idx_founded_at ON companies(founded_at);
+    -- County breakdowns (stats, analyze --by county, reports) read only this index, never the wide JSON rows
+    CREATE INDEX IF NOT EXISTS idx_maakond ON companies(maakond);
+    -- Persons denormalization table
+    CREATE TABLE IF NOT EXISTS persons (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_code INTEGER NOT NULL,
+        source TEXT NOT NULL,
+        first_name TEXT, last_name TEXT, full_name TEXT,
+        id_code TEXT, id_hash TEXT,
+        role TEXT, start_date TEXT, end_date TEXT,
+        ownership_pct REAL, contribution_amount REAL, currency TEXT,
+        country TEXT,
+        FOREIGN KEY (company_code) REFERENCES companies(code)
+    );
+    CREATE INDEX IF NOT EXISTS idx_persons_name ON persons(full_name);
+    CREATE INDEX IF NOT EXISTS idx_persons_id_code ON persons(id_code);
+    CREATE INDEX IF NOT EXISTS idx_persons_company ON persons(company_code);
+    CREATE INDEX IF NOT EXISTS idx_persons_source ON persons(source);
+    CREATE INDEX IF NOT EXISTS idx_persons_role ON persons(role);
+"""
+
+DERIVED_COLUMNS = [
+    ("capital", "REAL"), ("capital_currency", "TEXT"), ("email", "TEXT"),
+    ("phone", "TEXT"), ("website", "TEXT"), ("employee_count", "INTEGER"),
+    ("vat_number", "TEXT"), ("employee_prev", "INTEGER"),
+]
+
+DERIVED_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_capital ON companies(capital);
+    CREATE INDEX IF NOT EXISTS idx_employee_count ON companies(employee_count);
+    CREATE INDEX IF NOT EXISTS idx_vat_number ON companies(vat_number);
+    CREATE INDEX IF NOT EXISTS idx_email ON companies(email);
+"""
+
+# Re-imported base rows reset everything the base CSV replaces, like INSERT OR REPLACE did, but update in place and keep
+# the PDF enrichment; rows whose stored JSON already holds every base field unchanged (with or without merged data on
+# top) are not rewritten at all
+BASE_UPSERT_SQL = f"""INSERT INTO companies (code, name, status, maakond, linn, legal_form, founded_at, full_data, vat_number)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(code) DO UPDATE SET name = excluded.name, status = excluded.status, maakond = excluded.maakond,
+        linn = excluded.linn, legal_form = excluded.legal_form, founded_at = excluded.founded_at,
+        full_data = excluded.full_data, vat_number = excluded.vat_number,
+        {", ".join(f"{col} = NULL" for col, _ in DERIVED_COLUMNS if col != "vat_number")}
+    WHERE json_patch(companies.full_data, excluded.full_data) IS NOT companies.full_data"""
+
+# Trigram index over company names: `name LIKE '%x%'` (x >= 3 chars) becomes an index probe instead of a table scan.
+# External content, kept in sync by triggers. Base rows are upserted (never REPLACEd), so re-imports go through the UPDATE trigger.
+NAME_FTS_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS companies_fts USING fts5(name, content='companies', content_rowid='code', tokenize='trigram');
+    CREATE TRIGGER IF NOT EXISTS companies_fts_ai AFTER INSERT ON companies BEGIN
+        INSERT INTO companies_fts(rowid, name) VALUES (new.code, new.name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS companies_fts_ad AFTER DELETE ON companies BEGIN
+        INSERT INTO companies_fts(companies_fts, rowid, name) VALUES ('delete', old.code, old.name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS companies_fts_au AFTER UPDATE OF name ON companies BEGIN
+        INSERT INTO companies_fts(companies_fts, rowid, name) VALUES ('delete', old.code, old.name);
+        INSERT INTO companies_fts(rowid, name) VALUES (new.code, new.name);
+    END;
+"""
+
+# Stored JSON is compact UTF-8 (no padding, no \uXXXX escapes) so LIKE filters see the real characters. orjson (the
+# "fast" extra) and the stdlib fallback agree on registry data (strings, ints, plain decimals) but not on every float:
+# orjson writes 1.5e-7 where json writes 1.5e-07, and null for NaN/Infinity where json writes NaN/Infinity
+if orjson:
+    def _compact_json(obj): return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    _json_loads = orjson.loads
+else:
+    _compact_json = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    _json_loads = json.loads
+
+WAL_AUTOCHECKPOINT_PAGES = 10000
+# WAL makes synchronous=NORMAL crash-safe (only the last commits can be lost on power failure);
+# 256 MiB page cache and a 1 GiB memory map keep merge lookups and search scans out of read() calls
+CONNECTION_PRAGMAS = ("synchronous=NORMAL", "temp_store=MEMORY", "cache_size=-262144", "mmap_size=1073741824")
+CHECKPOINT_EVERY_BATCHES = 10  # explicit PASSIVE checkpoint cadence during bulk loads
+REBUILD_PAGE_SIZE = 10000
+SEARCH_FETCH_SIZE = 1024
+
+PERSONS_COLUMNS = ("company_code", "source", "first_name", "last_name", "full_name", "id_code", "id_hash", "role",
+                   "start_date", "end_date", "ownership_pct", "contribution_amount", "currency", "country")
+
+def _persons_select(source, group, inner, last, role, dates=True, pct="NULL", amount="NULL", currency="NULL", country="NULL"):
+    """SQL projecting companies.full_data -> $.group[*].inner[*] into persons rows (mirrors the old Python loop)."""
+    first_sql = "COALESCE(json_extract(p.value, '$.eesnimi'), '')"
+    last_sql = f"COALESCE(json_extract(p.value, '$.{last}'), '')"
+    start, end = ("json_extract(p.value, '$.algus_kpv')", "json_extract(p.value, '$.lopp_kpv')") if dates else ("NULL", "NULL")
+    return f"""INSERT INTO persons ({', '.join(PERSONS_COLUMNS)})
+        SELECT c.code, '{source}', NULLIF({first_sql}, ''), NULLIF({last_sql}, ''), NULLIF(TRIM({first_sql} || ' ' || {last_sql}), ''),
+               NULLIF(CAST(json_extract(p.value, '$.isikukood_registrikood') AS TEXT), ''),
+               json_extract(p.value, '$.isikukood_hash'), json_extract(p.value, '$.{role}'),
+               {start}, {end}, {pct}, {amount}, {currency}, {country}
+        FROM companies c, json_each(c.full_data, '$.{group}') AS g, json_each(g.value, '$.{inner}') AS p
+        WHERE json_type(c.full_data, '$.{group}') = 'array' AND g.type = 'object' AND p.type = 'object'"""
+
+def _sql_num(path):
+    # Python truthiness + float(): JSON numbers except 0, and strings that are a whole number ('50.5', not '50,5' or
+    # '1 250', which a bare CAST would cut to their numeric prefix); anything else is NULL
+    val = f"json_extract(p.value, '{path}')"
+    return f"""CASE json_type(p.value, '{path}') WHEN 'integer' THEN CAST(NULLIF({val}, 0) AS REAL) WHEN 'real' THEN NULLIF({val}, 0)
+        WHEN 'text' THEN CASE WHEN json_valid({val}) AND json_type({val}) IN ('integer', 'real') THEN CAST({val} AS REAL) END END"""
+
+PERSONS_POPULATE_SQL = (
+    _persons_select("board", "isikud", "kaardile_kantud_isikud", "nimi_arinimi", "isiku_roll_tekstina"),
+    _persons_select("shareholder", "osanikud", "osanikud", "nimi_arinimi", "osaluse_omandiliik_tekstina",
+                    pct=_sql_num("$.osaluse_protsent"),
+                    amount=f"COALESCE({_sql_num('$.osamaksu_summa')}, {_sql_num('$.osaluse_suurus')})",
+                    currency="COALESCE(NULLIF(json_extract(p.value, '$.valuuta'), ''), json_extract(p.value, '$.osaluse_valuuta'))"),
+    _persons_select("beneficiary", "kasusaajad", "kasusaajad", "nimi", "kontrolli_teostamise_viis_tekstina", dates=False,
+                    country="json_extract(p.value, '$.aadress_riik_tekstina')"),
+)
+
+# Contact type (sidevahendid.liik_tekstina) -> email/phone/website; unseen types are classified once and cached
+CONTACT_KIND = {
+    "Elektronposti aadress": "email", "E-posti aadress": "email",
+    "Telefon": "phone", "Mobiiltelefon": "phone",
+    "Interneti WWW aadress": "website", "Faks": None,
+}
+
+def contact_kind(ctype):
+    try:
+        return CONTACT_KIND[ctype]
+    except KeyError:
+        low = (ctype or '').lower()
+        if 'mail' in low or 'post' in low: kind = 'email'
+        elif 'telefon' in low or 'mobiil' in low: kind = 'phone'
+        elif 'www' in low or 'internet' in low: kind = 'website'
+        else: kind = None
+        CONTACT_KIND[ctype] = kind
+        return kind
+
 class RegistryBackend(ABC):
     @abstractmethod
     def insert_batch_base(self, batch): pass
@@ -330,6 +522,10 @@ class RegistryBackend(ABC):
     def update_batch_general(self, batch): pass
     @abstractmethod
     def update_enrichment(self, code: int, enrichment: dict): pass
+    def update_enrichment_batch(self, items):
+        for code, enrichment in items: self.update_enrichment(code, enrichment)
+    @contextmanager
+    def bulk_load(self, rewrites_all=True): yield
     @abstractmethod
     def search(self, term=None, person=None, location=None, status=None, limit=None): pass
     @abstractmethod
@@ -344,57 +540,61 @@ class RegistryBackend(ABC):
 class SQLiteBackend(RegistryBackend):
     def __init__(self, db_path: Path):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False, timeout=30, cached_statements=256)
         self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA wal_autocheckpoint = {WAL_AUTOCHECKPOINT_PAGES}")
+        for pragma in CONNECTION_PRAGMAS: self.conn.execute(f"PRAGMA {pragma}")
         self.conn.row_factory = sqlite3.Row
+        self._batches_since_checkpoint = 0
         self._create_tables()
 
     def _create_tables(self):
-        with self.conn:
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS companies (
-                    code INTEGER PRIMARY KEY, name TEXT, status TEXT, maakond TEXT, linn TEXT,
-                    legal_form TEXT, founded_at TEXT, full_data JSON DEFAULT '{}', enrichment JSON
-                )
-            """)
-            self.conn.execute("CREATE TABLE IF NOT EXISTS sync_state (filename TEXT PRIMARY KEY, status TEXT)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_name ON companies(name)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_legal_form ON companies(legal_form)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_status ON companies(status)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_founded_at ON companies(founded_at)")
-            # New columns (Phase 1)
-            existing = {r[1] for r in self.conn.execute("PRAGMA table_info(companies)").fetchall()}
-            new_cols = [
-                ("capital", "REAL"), ("capital_currency", "TEXT"), ("email", "TEXT"),
-                ("phone", "TEXT"), ("website", "TEXT"), ("employee_count", "INTEGER"),
-                ("vat_number", "TEXT"),
-            ]
-            for col, ctype in new_cols:
-                if col not in existing:
-                    self.conn.execute(f"ALTER TABLE companies ADD COLUMN {col} {ctype}")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_capital ON companies(capital)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_employee_count ON companies(employee_count)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_vat_number ON companies(vat_number)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_email ON companies(email)")
-            # Persons denormalization table
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS persons (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    company_code INTEGER NOT NULL,
-                    source TEXT NOT NULL,
-                    first_name TEXT, last_name TEXT, full_name TEXT,
-                    id_code TEXT, id_hash TEXT,
-                    role TEXT, start_date TEXT, end_date TEXT,
-                    ownership_pct REAL, contribution_amount REAL, currency TEXT,
-                    country TEXT,
-                    FOREIGN KEY (company_code) REFERENCES companies(code)
-                )
-            """)
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_persons_name ON persons(full_name)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_persons_id_code ON persons(id_code)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_persons_company ON persons(company_code)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_persons_source ON persons(source)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_persons_role ON persons(role)")
+        self.conn.executescript(f"BEGIN;{SCHEMA_SQL}COMMIT;")
+        # New columns (Phase 1)
+        existing = {r[1] for r in self.conn.execute("PRAGMA table_info(companies)").fetchall()}
+        alters = "".join(f"ALTER TABLE companies ADD COLUMN {col} {ctype};" for col, ctype in DERIVED_COLUMNS if col not in existing)
+        has_fts = self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'companies_fts'").fetchone()
+        self.conn.executescript(f"BEGIN;{alters}{DERIVED_INDEX_SQL}{NAME_FTS_SQL}COMMIT;")
+        if not has_fts:
+            # Databases from before the name index: fill it once from the existing rows
+            self.conn.execute("INSERT INTO companies_fts(companies_fts) VALUES ('rebuild')")
+        if "employee_prev" not in existing:
+            # Databases from before the growth filter: fill it once from the stored annual reports
+            self._backfill_employee_prev()
+
+    def _backfill_employee_prev(self):
+        last_code = 0
+        while rows := self.conn.execute("""SELECT code, json_extract(full_data, '$.yldandmed.info_majandusaasta_aruannetest') FROM companies
+                                           WHERE code > ? ORDER BY code LIMIT ?""", (last_code, REBUILD_PAGE_SIZE)).fetchall():
+            prev = [(e, code) for code, reports in rows if reports and (e := _top2_emp(_json_loads(reports))[1]) is not None]
+            with self._transaction(): self.conn.executemany("UPDATE companies SET employee_prev = ? WHERE code = ?", prev)
+            last_code = rows[-1][0]
+
+    @contextmanager
+    def _transaction(self):
+        # The connection runs in autocommit mode; batches get one explicit BEGIN/COMMIT (reentrant for nested callers)
+        if self.conn.in_transaction:
+            yield; return
+        self.conn.execute("BEGIN")
+        try: yield
+        except BaseException: self.conn.execute("ROLLBACK"); raise
+        else: self.conn.execute("COMMIT")
+
+    @contextmanager
+    def bulk_load(self, rewrites_all=True):
+        """Drop the secondary indexes on companies/persons for a merge and build each once afterwards from its stored SQL."""
+        # Only worth it when (nearly) every row is rewritten or the table is still empty; smaller merges keep maintaining
+        # the indexes, which also leaves them in place for searches running alongside
+        if not rewrites_all and self.conn.execute("SELECT EXISTS (SELECT 1 FROM companies)").fetchone()[0]:
+            yield; return
+        indexes = self.conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name IN ('companies', 'persons') AND sql IS NOT NULL").fetchall()
+        for name, _ in indexes: self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+        try: yield
+        finally:
+            # A crash before this point is harmless: _create_tables recreates them (IF NOT EXISTS) on the next start
+            logger.info("Rebuilding indexes...")
+            with self._transaction():
+                for _, sql in indexes: self.conn.execute(sql)
 
     @staticmethod
     def _normalize_date(date_str):
@@ -444,91 +644,107 @@ class SQLiteBackend(RegistryBackend):
         contacts = item.get('yldandmed', {}).get('sidevahendid', [])
         email = phone = website = None
         for c in contacts:
-            ctype = (c.get('liik_tekstina') or '').lower()
             val = c.get('sisu', '')
             if not val:
                 continue
-            if not email and ('post' in ctype or 'mail' in ctype):
-                email = val
-            elif not phone and ('telefon' in ctype or 'mobiil' in ctype):
-                phone = val
-            elif not website and ('www' in ctype or 'internet' in ctype):
-                website = val
+            kind = contact_kind(c.get('liik_tekstina'))
+            if kind == 'email':
+                if not email: email = val
+            elif kind == 'phone':
+                if not phone: phone = val
+            elif kind == 'website':
+                if not website: website = val
         return email, phone, website
 
     @staticmethod
-    def _extract_latest_employees(item):
+    def _extract_employees(item):
+        """(latest, previous) employee counts from the annual reports."""
         reports = item.get('yldandmed', {}).get('info_majandusaasta_aruannetest', [])
         if not reports:
-            return None
-        sorted_reports = sorted(reports, key=lambda r: r.get('majandusaasta_perioodi_lopp_kpv', ''), reverse=True)
-        for r in sorted_reports:
-            emp = r.get('tootajate_arv')
-            if emp is not None:
-                try:
-                    return int(emp)
-                except (TypeError, ValueError):
-                    pass
-        return None
+            return None, None
+        return _top2_emp(reports)
+
+    def _base_rows(self, batch):
+        county, city, norm_date, dumps = self._extract_county, self._extract_city, self._normalize_date, _compact_json
+        for i in batch:
+            get = i.get
+            yield (get('ariregistri_kood'), get('nimi'), get('ettevotja_staatus_tekstina'), county(i), city(i),
+                   get('ettevotja_oiguslik_vorm'), norm_date(get('ettevotja_esmakande_kpv')), dumps(i), get('kmkr_nr') or None)
 
     def insert_batch_base(self, batch):
-        with self.conn:
-            self.conn.executemany(
-                """INSERT OR REPLACE INTO companies
-                   (code, name, status, maakond, linn, legal_form, founded_at, full_data, vat_number)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                [(i.get('ariregistri_kood'), i.get('nimi'), i.get('ettevotja_staatus_tekstina'),
-                  self._extract_county(i), self._extract_city(i),
-                  i.get('ettevotja_oiguslik_vorm'), self._normalize_date(i.get('ettevotja_esmakande_kpv')),
-                  json.dumps(i), i.get('kmkr_nr') or None) for i in batch]
-            )
+        with self._transaction(): self.conn.executemany(BASE_UPSERT_SQL, self._base_rows(batch))
+        self._maybe_checkpoint()
 
     def update_batch_json(self, key, data_map):
-        with self.conn:
+        # Per-row primary-key UPDATEs; staging into a temp table for one UPDATE ... FROM measured slower
+        path = f"$.{key}"
+        with self._transaction():
             self.conn.executemany(
                 "UPDATE companies SET full_data = json_set(full_data, ?, json(?)) WHERE code = ?",
-                [(f"$.{key}", json.dumps(val), code) for code, val in data_map.items()]
+                [(path, _compact_json(val), code) for code, val in data_map.items()]
             )
+        self._maybe_checkpoint()
+
+    def _general_rows(self, batch):
+        for item in batch:
+            code = item.get('ariregistri_kood')
+            if not code: continue
+            cap_amt, cap_cur = self._extract_latest_capital(item)
+            email, phone, website = self._extract_contacts(item)
+            emp, emp_prev = self._extract_employees(item)
+            yield {"code": code, "patch": _compact_json(item), "status": item.get('staatus_tekstina') or None,
+                   "founded": self._normalize_date(item.get('esmaregistreerimise_kpv')) or None,
+                   "cap": cap_amt, "cur": cap_cur, "email": email, "phone": phone, "website": website,
+                   "emp": emp, "emp_prev": emp_prev}
 
     def update_batch_general(self, batch):
-        with self.conn:
-            for item in batch:
-                code = item.get('ariregistri_kood')
-                if not code: continue
-                self.conn.execute("UPDATE companies SET full_data = json_patch(full_data, ?) WHERE code = ?", (json.dumps(item), code))
-                updates = []; params = []
-                status = item.get('staatus_tekstina')
-                if status: updates.append("status = COALESCE(?, status)"); params.append(status)
-                founded = self._normalize_date(item.get('esmaregistreerimise_kpv'))
-                if founded: updates.append("founded_at = COALESCE(?, founded_at)"); params.append(founded)
-                # Extract new derived columns
-                cap_amt, cap_cur = self._extract_latest_capital(item)
-                if cap_amt is not None:
-                    updates.append("capital = ?"); params.append(cap_amt)
-                    updates.append("capital_currency = ?"); params.append(cap_cur)
-                email, phone, website = self._extract_contacts(item)
-                if email: updates.append("email = ?"); params.append(email)
-                if phone: updates.append("phone = ?"); params.append(phone)
-                if website: updates.append("website = ?"); params.append(website)
-                emp = self._extract_latest_employees(item)
-                if emp is not None: updates.append("employee_count = ?"); params.append(emp)
-                if updates:
-                    params.append(code)
-                    self.conn.execute(f"UPDATE companies SET {', '.join(updates)} WHERE code = ?", params)
+        # One statement for the JSON patch and every derived column; a NULL parameter keeps the stored value
+        with self._transaction():
+            self.conn.executemany(
+                """UPDATE companies SET full_data = json_patch(full_data, :patch),
+                       status = COALESCE(:status, status), founded_at = COALESCE(:founded, founded_at),
+                       capital = COALESCE(:cap, capital), capital_currency = CASE WHEN :cap IS NULL THEN capital_currency ELSE :cur END,
+                       email = COALESCE(:email, email), phone = COALESCE(:phone, phone), website = COALESCE(:website, website),
+                       employee_count = COALESCE(:emp, employee_count), employee_prev = COALESCE(:emp_prev, employee_prev)
+                   WHERE code = :code""",
+                self._general_rows(batch)
+            )
+        self._maybe_checkpoint()
+
+    def checkpoint(self, mode="PASSIVE"):
+        busy, log, checkpointed = self.conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        logger.debug(f"WAL checkpoint ({mode}): busy={busy}, log={log}, checkpointed={checkpointed}")
+        self._batches_since_checkpoint = 0
+        return busy, log, checkpointed
+
+    def _maybe_checkpoint(self):
+        self._batches_since_checkpoint += 1
+        if self._batches_since_checkpoint >= CHECKPOINT_EVERY_BATCHES: self.checkpoint()
 
     def update_enrichment(self, code: int, enrichment: dict):
-        with self.conn: self.conn.execute("UPDATE companies SET enrichment = ? WHERE code = ?", (json.dumps(enrichment), code))
+        with self._transaction(): self.conn.execute("UPDATE companies SET enrichment = ? WHERE code = ?", (_compact_json(enrichment), code))
+
+    def update_enrichment_batch(self, items):
+        with self._transaction():
+            self.conn.executemany("UPDATE companies SET enrichment = ? WHERE code = ?", [(_compact_json(e), code) for code, e in items])
 
     def search(self, term=None, person=None, location=None, status=None, limit=None,
                emtak=None, founded_after=None, founded_before=None, legal_form=None,
-               min_capital=None, max_capital=None, has_email=False, has_phone=False, has_website=False):
+               min_capital=None, max_capital=None, has_email=False, has_phone=False, has_website=False,
+               min_employees=None, max_employees=None, growing=False):
         query = "SELECT * FROM companies WHERE 1=1"; params = []
         if term:
             if term.isdigit(): query += " AND code = ?"; params.append(int(term))
+            elif len(term) >= 3: query += " AND code IN (SELECT rowid FROM companies_fts WHERE name LIKE ?)"; params.append(f"%{term}%")
             else: query += " AND name LIKE ?"; params.append(f"%{term}%")
         if location: query += " AND (maakond LIKE ? OR linn LIKE ?)"; params.extend([f"%{location}%", f"%{location}%"])
-        if status: query += " AND (status LIKE ? OR full_data LIKE ?)"; params.extend([f"%{status}%", f"%{status}%"])
-        if person: query += " AND (full_data LIKE ? OR enrichment LIKE ?)"; params.extend([f"%{person}%", f"%{person}%"])
+        # Status comes from its own column (like analyze), not a LIKE over every company's JSON text
+        if status: query += " AND status LIKE ?"; params.append(f"%{status}%")
+        # People can sit under any merged key, so the JSON text is still searched; the persons table adds full names
+        # that are split over two fields (eesnimi + nimi_arinimi)
+        if person:
+            query += " AND (full_data LIKE ? OR enrichment LIKE ? OR code IN (SELECT company_code FROM persons WHERE full_name LIKE ?))"
+            params.extend([f"%{person}%"] * 3)
         if emtak:
             if isinstance(emtak, list):
                 placeholders = " OR ".join(["json_extract(e.value, '$.emtak_kood') LIKE ?"] * len(emtak))
@@ -547,11 +763,20 @@ class SQLiteBackend(RegistryBackend):
         if has_email: query += " AND email IS NOT NULL"
         if has_phone: query += " AND phone IS NOT NULL"
         if has_website: query += " AND website IS NOT NULL"
+        # Like the old Python filter: only applied when a bound is non-zero, and companies without employee data pass a max-only filter
+        if min_employees or max_employees:
+            if min_employees is not None: query += " AND employee_count >= ?"; params.append(int(min_employees))
+            if max_employees is not None: query += " AND (employee_count IS NULL OR employee_count <= ?)"; params.append(int(max_employees))
+        if growing: query += " AND employee_count > employee_prev"
+        # Code order whichever index the planner drives from, so --limit keeps the same companies with or without filters
+        query += " ORDER BY code"
         if limit: query += f" LIMIT {int(limit)}"
-        for row in self.conn.execute(query, params):
-            data = json.loads(row['full_data'])
-            if row['enrichment']: data['enrichment'] = json.loads(row['enrichment'])
-            yield data
+        cur = self.conn.execute(query, params); cur.arraysize = SEARCH_FETCH_SIZE
+        while rows := cur.fetchmany():
+            for row in rows:
+                data = _json_loads(row['full_data'])
+                if row['enrichment']: data['enrichment'] = _json_loads(row['enrichment'])
+                yield data
 
     def analyze(self, by, emtak=None, location=None, status=None, legal_form=None,
                 founded_after=None, founded_before=None, top=20):
@@ -630,11 +855,36 @@ class SQLiteBackend(RegistryBackend):
         params.append(top)
         return [(row[0], row[1]) for row in self.conn.execute(query, params)]
 
+    def analyze_multi(self, dims, statuses, founded_after=None, founded_before=None, top=20):
+        """Top-N per (status, dim) in one windowed query per dimension instead of one per pair."""
+        st_case = "CASE " + " ".join("WHEN c.status LIKE ? THEN ?" for _ in statuses) + " END"
+        st_params = [p for st in statuses for p in (f"%{st}%", st)]
+        where_sql = ""; where_params = []
+        if founded_after: where_sql += " AND c.founded_at >= ?"; where_params.append(founded_after)
+        if founded_before: where_sql += " AND c.founded_at <= ?"; where_params.append(founded_before)
+        out = {(st, dim): [] for st in statuses for dim in dims}
+        for dim in dims:
+            if dim == "county":
+                src = f"SELECT {st_case} AS st, COALESCE(c.maakond, 'Unknown') AS k, COALESCE(c.maakond, 'Unknown') AS grp FROM companies c WHERE 1=1{where_sql}"
+            elif dim == "emtak":
+                src = f"""SELECT {st_case} AS st, json_extract(items.value, '$.emtak_kood') AS k,
+                    json_extract(items.value, '$.emtak_kood') || ' - ' || COALESCE(json_extract(items.value, '$.emtak_tekstina'), '?') AS grp
+                    FROM companies c, json_each(c.full_data, '$.yldandmed.teatatud_tegevusalad') AS items
+                    WHERE json_extract(items.value, '$.emtak_kood') IS NOT NULL{where_sql}"""
+            else:
+                raise ValueError(f"analyze_multi does not support by={dim!r}")
+            query = f"""WITH r AS ({src}), g AS (SELECT st, grp, COUNT(*) AS cnt FROM r WHERE st IS NOT NULL GROUP BY st, k),
+                ranked AS (SELECT st, grp, cnt, ROW_NUMBER() OVER (PARTITION BY st ORDER BY cnt DESC) AS rn FROM g)
+                SELECT st, grp, cnt FROM ranked WHERE rn <= ? ORDER BY st, rn"""
+            for st, grp, cnt in self.conn.execute(query, st_params + where_params + [top]):
+                out[(st, dim)].append((grp, cnt))
+        return out
+
     def is_file_processed(self, filename: str):
         return self.conn.execute("SELECT 1 FROM sync_state WHERE filename=? AND status='DONE'", (filename,)).fetchone() is not None
 
     def mark_file_status(self, filename: str, status: str):
-        with self.conn: self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (filename, status))
+        with self._transaction(): self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (filename, status))
 
     def get_stats(self):
         total = self.conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
@@ -734,7 +984,7 @@ class SQLiteBackend(RegistryBackend):
         if code:
             row = self.conn.execute("SELECT full_data FROM companies WHERE code = ?", (int(code),)).fetchone()
             if not row: return []
-            data = json.loads(row[0])
+            data = _json_loads(row[0])
             reports = data.get('yldandmed', {}).get('info_majandusaasta_aruannetest', [])
             trend = []
             for r in sorted(reports, key=lambda x: x.get('majandusaasta_perioodi_lopp_kpv', '')):
@@ -772,103 +1022,53 @@ class SQLiteBackend(RegistryBackend):
 
     def populate_persons(self):
         logger.info("Populating persons table...")
-        with self.conn:
+        with self._transaction():
             self.conn.execute("DELETE FROM persons")
-            cursor = self.conn.execute("SELECT code, full_data FROM companies")
-            batch = []; count = 0
-            for row in cursor:
-                code = row[0]
-                data = json.loads(row[1])
-                # Board members from kaardile_kantud_isikud
-                for group in data.get('isikud', []):
-                    if isinstance(group, dict):
-                        for p in group.get('kaardile_kantud_isikud', []):
-                            first = p.get('eesnimi', '')
-                            last = p.get('nimi_arinimi', '')
-                            full = f"{first} {last}".strip()
-                            batch.append((code, 'board', first or None, last or None, full or None,
-                                         str(p.get('isikukood_registrikood', '')) or None,
-                                         p.get('isikukood_hash'),
-                                         p.get('isiku_roll_tekstina'),
-                                         p.get('algus_kpv'), p.get('lopp_kpv'),
-                                         None, None, None, None))
-                # Shareholders from osanikud
-                for group in data.get('osanikud', []):
-                    if isinstance(group, dict):
-                        for s in group.get('osanikud', []):
-                            first = s.get('eesnimi', '')
-                            last = s.get('nimi_arinimi', '')
-                            full = f"{first} {last}".strip()
-                            pct = s.get('osaluse_protsent')
-                            amt = s.get('osamaksu_summa') or s.get('osaluse_suurus')
-                            cur = s.get('valuuta') or s.get('osaluse_valuuta')
-                            try: pct = float(pct) if pct else None
-                            except (TypeError, ValueError): pct = None
-                            try: amt = float(amt) if amt else None
-                            except (TypeError, ValueError): amt = None
-                            batch.append((code, 'shareholder', first or None, last or None, full or None,
-                                         str(s.get('isikukood_registrikood', '')) or None,
-                                         s.get('isikukood_hash'),
-                                         s.get('osaluse_omandiliik_tekstina'),
-                                         s.get('algus_kpv'), s.get('lopp_kpv'),
-                                         pct, amt, cur, None))
-                # Beneficiaries from kasusaajad
-                for group in data.get('kasusaajad', []):
-                    if isinstance(group, dict):
-                        for b in group.get('kasusaajad', []):
-                            first = b.get('eesnimi', '')
-                            last = b.get('nimi', '')
-                            full = f"{first} {last}".strip()
-                            batch.append((code, 'beneficiary', first or None, last or None, full or None,
-                                         str(b.get('isikukood_registrikood', '')) or None,
-                                         b.get('isikukood_hash'),
-                                         b.get('kontrolli_teostamise_viis_tekstina'),
-                                         None, None, None, None, None,
-                                         b.get('aadress_riik_tekstina')))
-                count += 1
-                if len(batch) >= 10000:
-                    self.conn.executemany(
-                        """INSERT INTO persons (company_code, source, first_name, last_name, full_name,
-                           id_code, id_hash, role, start_date, end_date,
-                           ownership_pct, contribution_amount, currency, country) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)""", batch)
-                    batch = []
-            if batch:
-                self.conn.executemany(
-                    """INSERT INTO persons (company_code, source, first_name, last_name, full_name,
-                       id_code, id_hash, role, start_date, end_date,
-                       ownership_pct, contribution_amount, currency, country) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)""", batch)
+            # Project the nested JSON arrays straight into rows inside SQLite; no per-company json.loads in Python
+            for sql in PERSONS_POPULATE_SQL: self.conn.execute(sql)
         total = self.conn.execute("SELECT COUNT(*) FROM persons").fetchone()[0]
+        count = self.conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
         logger.info(f"Populated {total:,} person records from {count:,} companies")
 
     def rebuild_derived_columns(self):
         logger.info("Rebuilding derived columns from full_data...")
-        cursor = self.conn.execute("SELECT code, full_data FROM companies")
-        count = 0
-        with self.conn:
-            for row in cursor:
-                code = row[0]
-                data = json.loads(row[1])
-                updates = []; params = []
-                cap_amt, cap_cur = self._extract_latest_capital(data)
-                if cap_amt is not None:
-                    updates.append("capital = ?"); params.append(cap_amt)
-                    updates.append("capital_currency = ?"); params.append(cap_cur)
-                email, phone, website = self._extract_contacts(data)
-                if email: updates.append("email = ?"); params.append(email)
-                if phone: updates.append("phone = ?"); params.append(phone)
-                if website: updates.append("website = ?"); params.append(website)
-                emp = self._extract_latest_employees(data)
-                if emp is not None: updates.append("employee_count = ?"); params.append(emp)
-                if updates:
-                    params.append(code)
-                    self.conn.execute(f"UPDATE companies SET {', '.join(updates)} WHERE code = ?", params)
-                count += 1
-                if count % 50000 == 0:
-                    logger.info(f"  Processed {count:,} companies...")
+        count = 0; last_code = 0
+        while True:
+            # Page by primary key so no read cursor stays open across commits and the checkpointer can make progress
+            rows = self.conn.execute("SELECT code, full_data FROM companies WHERE code > ? ORDER BY code LIMIT ?",
+                                     (last_code, REBUILD_PAGE_SIZE)).fetchall()
+            if not rows: break
+            with self._transaction():
+                for code, full_data in rows:
+                    self._rebuild_row(code, _json_loads(full_data))
+            count += len(rows); last_code = rows[-1][0]
+            self.checkpoint()
+            if count % 50000 < REBUILD_PAGE_SIZE:
+                logger.info(f"  Processed {count:,} companies...")
         logger.info(f"Rebuilt derived columns for {count:,} companies")
 
+    def _rebuild_row(self, code, data):
+        updates = []; params = []
+        cap_amt, cap_cur = self._extract_latest_capital(data)
+        if cap_amt is not None:
+            updates.append("capital = ?"); params.append(cap_amt)
+            updates.append("capital_currency = ?"); params.append(cap_cur)
+        email, phone, website = self._extract_contacts(data)
+        if email: updates.append("email = ?"); params.append(email)
+        if phone: updates.append("phone = ?"); params.append(phone)
+        if website: updates.append("website = ?"); params.append(website)
+        emp, emp_prev = self._extract_employees(data)
+        if emp is not None: updates.append("employee_count = ?"); params.append(emp)
+        if emp_prev is not None: updates.append("employee_prev = ?"); params.append(emp_prev)
+        if updates:
+            params.append(code)
+            self.conn.execute(f"UPDATE companies SET {', '.join(updates)} WHERE code = ?", params)
+
     def commit(self): self.conn.commit()
 
+# Name the tests and older scripts import the SQLite backend under
+RegistryDB = SQLiteBackend
+
 # ============================================================
 # Registry Logic
 # ============================================================
@@ -879,11 +1079,13 @@ class EstonianRegistry:
         "ettevotja_rekvisiidid__osanikud.json.zip", "ettevotja_rekvisiidid__kasusaajad.json.zip",
         "ettevotja_rekvisiidid__kaardile_kantud_isikud.json.zip", "ettevotja_rekvisiidid__registrikaardid.json.zip",
     ]
+    # Files that set indexed companies columns (name, county, capital, contacts, ...) for every company
+    INDEXED_FILES = frozenset(DATA_FILES[:2])
 
     def __init__(self, data_dir="data", chunk_size=50000, backend: RegistryBackend = None, use_db=True):
         self.data_dir = Path(data_dir); self.download_dir = self.data_dir / "downloads"
-        self.extracted_dir = self.data_dir / "extracted"; self.db_path = self.data_dir / "registry.db"
-        for d in [self.download_dir, self.extracted_dir]: d.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.data_dir / "registry.db"
+        self.download_dir.mkdir(parents=True, exist_ok=True)
         self.chunk_size = chunk_size
         if not use_db: self.db = None
         else: self.db = backend or SQLiteBackend(self.db_path)
@@ -892,138 +1094,229 @@ class EstonianRegistry:
         Downloader(self.download_dir, self.DATA_FILES).run()
         self.merge(force=force)
 
-    def merge(self, force=False):
+    def merge(self, force=False, parallel=None):
         if not self.db: return
+        # On a single CPU the child parsers only compete with the writer (and add pickling), so parse in-process
+        if parallel is None: parallel = (os.cpu_count() or 1) > 1
         logger.info("Starting Merge...")
-        extracted = {}
+        pending = []
         for f in self.DATA_FILES:
-            zp = self.download_dir / f
-            if zp.exists():
-                with zipfile.ZipFile(zp, 'r') as zf:
-                    zf.extractall(self.extracted_dir); extracted[f] = self.extracted_dir / zf.namelist()[0]
-        for f, path in extracted.items():
+            if not (self.download_dir / f).exists(): continue
             if not force and self.db.is_file_processed(f):
                 logger.info(f"Skipping {f}"); continue
-            logger.info(f"Processing {f}...")
-            if f.endswith('.csv.zip'):
-                batch = []
-                with open(path, 'r', encoding='utf-8-sig') as csvf:
-                    for row in csv.DictReader(csvf, delimiter=';'):
-                        if row.get('ariregistri_kood'):
-                            row['ariregistri_kood'] = int(row['ariregistri_kood']); batch.append(row)
-                        if len(batch) >= self.chunk_size:
-                            self.db.insert_batch_base(batch); batch = []
-                if batch: self.db.insert_batch_base(batch)
-            elif 'yldandmed' in f:
-                batch = []
-                for item in iter_json_array(path):
-                    if item.get('ariregistri_kood'):
-                        item['ariregistri_kood'] = int(item['ariregistri_kood']); batch.append(item)
-                    if len(batch) >= self.chunk_size:
-                        self.db.update_batch_general(batch); batch = []
-                if batch: self.db.update_batch_general(batch)
-            else:
-                key = f.split('__')[-1].split('.')[0]; groups = defaultdict(list); count = 0
-                for item in iter_json_array(path):
-                    code = item.get('ariregistri_kood')
-                    if code: groups[int(code)].append(item.get(key, item)); count += 1
-                    if count >= self.chunk_size:
-                        self.db.update_batch_json(key, groups); groups = defaultdict(list); count = 0
-                if groups: self.db.update_batch_json(key, groups)
-            self.db.mark_file_status(f, 'DONE'); self.db.commit()
-        if force:
-            self.db.rebuild_derived_columns()
-            self.db.populate_persons()
-            self.db.commit()
-
-    def enrich(self, codes: list[str]):
+            pending.append(f)
+        if not pending and not force: return
+        # Indexes are built once at the end instead of maintained row by row, when the merge rewrites indexed columns
+        # of every company; the other files only patch full_data, which no index covers
+        with self.db.bulk_load(rewrites_all=force or any(f in self.INDEXED_FILES for f in pending)):
+            self._merge_files(pending, parallel)
+            if force:
+                self.db.rebuild_derived_columns()
+                self.db.populate_persons()
+                self.db.commit()
+        if force: self.db.checkpoint("TRUNCATE")
+
+    def _merge_files(self, pending, parallel):
+        import zipfile
+        parsers = {}
+        try:
+            for i, f in enumerate(pending):
+                logger.info(f"Processing {f}...")
+                if parallel:
+                    # JSON is parsed in child processes (this file and the next one) while this process only writes
+                    for nf in pending[i:i + 2]:
+                        if nf.endswith('.json.zip') and nf not in parsers: parsers[nf] = _start_parser(self.download_dir / nf, nf, self.chunk_size)
+                if f in parsers: self._apply_batches(_drain_parser(*parsers.pop(f)))
+                else:
+                    # Decompress and parse in one streaming pass instead of extracting to disk and reading it back
+                    with zipfile.ZipFile(self.download_dir / f, 'r') as zf, zf.open(zf.namelist()[0]) as member:
+                        self._apply_batches(member_batches(f, member, self.chunk_size))
+                self.db.mark_file_status(f, 'DONE'); self.db.commit()
+        finally:
+            for proc, _ in parsers.values(): proc.terminate()
+
+    def _apply_batches(self, batches):
+        for method, *args in batches: getattr(self.db, method)(*args)
+
+    def enrich(self, codes: list[str], batch_size=100):
         if not self.db: return
-        for code_str in codes:
-            try:
-                code = int(code_str); console.print(f"[info]Enriching {code}...[/info]")
-                pdf_bytes = download_registry_pdf(str(code))
-                if not pdf_bytes: continue
-                self.db.update_enrichment(code, parse_pdf_content(pdf_bytes))
-                console.print(f"[success]Updated {code}[/success]"); time.sleep(1)
-            except Exception as e: logger.error(f"Error enriching {code_str}: {e}")
+        pending = []
+        try:
+            for code_str in codes:
+                try:
+                    code = int(code_str); console.print(f"[info]Enriching {code}...[/info]")
+                    pdf_bytes = download_registry_pdf(str(code))
+                    if not pdf_bytes: continue
+                    pending.append((code, parse_pdf_content(pdf_bytes))); time.sleep(1)
+                except Exception as e: logger.error(f"Error enriching {code_str}: {e}")
+                if len(pending) >= batch_size: self._flush_enrichment(pending); pending = []
+        finally:
+            # Parsed results are written even if the run is interrupted part-way
+            if pending: self._flush_enrichment(pending)
+
+    def _flush_enrichment(self, pending):
+        # A failed write is reported for the whole batch and not retried; "Updated" is only printed once a row is stored
+        try: self.db.update_enrichment_batch(pending)
+        except Exception as e:
+            logger.error(f"Error saving enrichment for {', '.join(str(code) for code, _ in pending)}: {e}"); return
+        for code, _ in pending: console.print(f"[success]Updated {code}[/success]")
 
     def export(self, output_path: Path, translate: bool = False):
         if not self.db: return
         logger.info(f"Exporting to {output_path}...")
-        results = []
-        for row in self.db.search(limit=None):
-            if translate: row = translate_item(row, to_en=True)
-            results.append(row)
-        with open(output_path, 'w', encoding='utf-8') as f: json.dump(results, f, ensure_ascii=False, indent=2)
+        rows = self.db.search(limit=None)
+        if translate: rows = (translate_item(row, to_en=True) for row in rows)
+        with open(output_path, 'w', encoding='utf-8') as f: dump_json_array(rows, f)
 
 # ============================================================
 # Utilities & PDF
 # ============================================================
 
+# Indented JSON text for CLI output and exports
+if orjson:
+    def dumps_pretty(obj): return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+else:
+    def dumps_pretty(obj): return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def print_json(obj):
+    """Highlight obj as one JSON document; callers pass every result at once so Pygments runs a single time."""
+    from rich.syntax import Syntax
+    console.print(Syntax(dumps_pretty(obj), "json", theme="monokai"))
+
 def download_registry_pdf(code: str):
     url = f"https://ariregister.rik.ee/eng/company/{code}/registry_card_pdf?registry_card_lang=eng"
     agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0"
+    import urllib.request
     try:
         req = urllib.request.Request(url, headers={'User-Agent': agent})
         with urllib.request.urlopen(req) as resp: return resp.read()
     except Exception as e: logger.error(f"Failed PDF download: {e}"); return None
 
+# --- precompiled patterns ---
+_CAPITAL_RE = re.compile(r"Capital:\s*([\d\s,]+)\s*([A-Z]{3})")
+_ID_RE = re.compile(r"([1-6]\d{10})")
+_NAME_RE = re.compile(r"([A-ZŠŽÕÄÖÜ][A-ZŠŽÕÄÖÜa-zšžõäöü\-]+\s+[A-ZŠŽÕÄÖÜ][A-ZŠŽÕÄÖÜa-zšžõäöü\-]+(?:\s+[A-ZŠŽÕÄÖÜ][A-ZŠŽÕÄÖÜa-zšžõäöü\-]+)*)")
+
 def parse_pdf_content(pdf_bytes: bytes):
+    from pypdf import PdfReader
     try:
         reader = PdfReader(io.BytesIO(pdf_bytes))
         full_text = "".join([page.extract_text() + "\n" for page in reader.pages])
         info = {"processed_at": datetime.now().isoformat(), "pages": len(reader.pages), "unmasked_ids": {}}
-        caps_match = re.search(r"Capital:\s*([\d\s,]+)\s*([A-Z]{3})", full_text)
+        caps_match = _CAPITAL_RE.search(full_text)
         if caps_match:
             info["capital"] = caps_match.group(1).strip(); info["currency"] = caps_match.group(2)
-        id_regex = re.compile(r"([1-6]\d{10})"); lines = [l.strip() for l in full_text.split("\n") if l.strip()]
-        for i, line in enumerate(lines):
-            id_matches = id_regex.findall(line)
-            if id_matches:
-                for p_id in id_matches:
-                    name_regex = re.compile(r"([A-ZŠŽÕÄÖÜ][A-ZŠŽÕÄÖÜa-zšžõäöü\-]+\s+[A-ZŠŽÕÄÖÜ][A-ZŠŽÕÄÖÜa-zšžõäöü\-]+(?:\s+[A-ZŠŽÕÄÖÜ][A-ZŠŽÕÄÖÜa-zšžõäöü\-]+)*)")
-                    names = name_regex.findall(line.replace(p_id, ""))
-                    if not names and i > 0: names = name_regex.findall(lines[i-1])
-                    if names:
-                        name = max(names, key=len).strip()
-                        info["unmasked_ids"][name] = p_id; info["unmasked_ids"][name.upper()] = p_id
+        # One scan over the whole text; IDs never span lines, so only matched lines are ever sliced out
+        n = len(full_text)
+        for m in _ID_RE.finditer(full_text):
+            p_id = m.group(1); start, end = m.span()
+            ls = full_text.rfind("\n", 0, start) + 1; le = full_text.find("\n", end)
+            names = _NAME_RE.findall(full_text[ls:n if le < 0 else le].strip().replace(p_id, ""))
+            if not names:
+                # Fall back to the nearest non-blank line above
+                while ls > 0:
+                    ps = full_text.rfind("\n", 0, ls - 1) + 1; prev = full_text[ps:ls - 1].strip()
+                    if prev: names = _NAME_RE.findall(prev); break
+                    ls = ps
+            if names:
+                name = max(names, key=len).strip()
+                info["unmasked_ids"][name.casefold()] = p_id
         return info
     except Exception as e: logger.error(f"Error parsing PDF: {e}"); return {}
 
-def _convert_decimals(obj):
-    from decimal import Decimal
-    if isinstance(obj, Decimal): return float(obj) if obj % 1 else int(obj)
-    if isinstance(obj, dict): return {k: _convert_decimals(v) for k, v in obj.items()}
-    if isinstance(obj, list): return [_convert_decimals(v) for v in obj]
-    return obj
-
-def iter_json_array(path):
-    if shutil.which("jq"):
-        proc = subprocess.Popen(["jq", "-c", ".[]", str(path)], stdout=subprocess.PIPE)
-        for line in proc.stdout: yield json.loads(line)
+def iter_json_array(src):
+    """Yield the items of a top-level JSON array from a binary file-like object (e.g. a zip member)."""
+    import ijson
+    # In-process C parser (yajl2_c when built); use_float yields plain floats instead of Decimals that need a second walk
+    yield from ijson.items(src, 'item', use_float=True)
+
+def member_batches(f, member, chunk_size):
+    """Parse one registry data file into (backend method, *args) write batches."""
+    if f.endswith('.csv.zip'):
+        batch = []
+        for row in csv.DictReader(io.TextIOWrapper(member, encoding='utf-8-sig', newline=''), delimiter=';'):
+            if row.get('ariregistri_kood'):
+                row['ariregistri_kood'] = int(row['ariregistri_kood']); batch.append(row)
+            if len(batch) >= chunk_size:
+                yield "insert_batch_base", batch; batch = []
+        if batch: yield "insert_batch_base", batch
+    elif 'yldandmed' in f:
+        batch = []
+        for item in iter_json_array(member):
+            if item.get('ariregistri_kood'):
+                item['ariregistri_kood'] = int(item['ariregistri_kood']); batch.append(item)
+            if len(batch) >= chunk_size:
+                yield "update_batch_general", batch; batch = []
+        if batch: yield "update_batch_general", batch
     else:
-        import ijson
-        with open(path, 'rb') as f:
-            for item in ijson.items(f, 'item'):
-                yield _convert_decimals(item)
+        key = f.split('__')[-1].split('.')[0]; groups = {}
+        for item in iter_json_array(member):
+            code = item.get('ariregistri_kood')
+            if not code: continue
+            if type(code) is not int: code = int(code)
+            try: val = item[key]
+            except KeyError: val = item
+            bucket = groups.get(code)
+            if bucket is None:
+                # Chunk by company (one json_set per code), flushing only on a new code so a company is never split
+                if len(groups) >= chunk_size:
+                    yield "update_batch_json", key, groups; groups = {}
+                bucket = groups[code] = []
+            bucket.append(val)
+        if groups: yield "update_batch_json", key, groups
+
+def _parse_worker(zp, f, chunk_size, out):
+    import zipfile
+    try:
+        with zipfile.ZipFile(zp, 'r') as zf, zf.open(zf.namelist()[0]) as member:
+            for batch in member_batches(f, member, chunk_size): out.put(batch)
+        out.put(None)
+    except BaseException as e: out.put(("error", f"{f}: {e!r}"))
+
+PARSER_POLL_SECONDS = 5
+
+def _start_parser(zp, f, chunk_size):
+    import multiprocessing
+    # A small queue bounds how far a parser can run ahead of the SQLite writer
+    out = multiprocessing.Queue(maxsize=2)
+    proc = multiprocessing.Process(target=_parse_worker, args=(zp, f, chunk_size, out), daemon=True); proc.start()
+    return proc, out
+
+def _drain_parser(proc, out):
+    import queue
+    while True:
+        try: batch = out.get(timeout=PARSER_POLL_SECONDS)
+        except queue.Empty:
+            if proc.is_alive(): continue
+            # A killed child (e.g. by the OOM killer) never sends its end marker; take what it flushed before exiting
+            try: batch = out.get(timeout=1)
+            except queue.Empty: raise RuntimeError(f"Parsing failed: parser process exited with code {proc.exitcode}") from None
+        if batch is None: break
+        if batch[0] == "error": raise RuntimeError(f"Parsing failed: {batch[1]}")
+        yield batch
+    proc.join()
 
 class Downloader:
+    COPY_CHUNK = 1 << 20; MAX_PARALLEL = 4
     def __init__(self, ddir, files):
         self.ddir = ddir; self.files = files; self.base = "https://avaandmed.ariregister.rik.ee/sites/default/files/avaandmed/"
     def run(self):
-        threads = [Thread(target=self._dl, args=(f,)) for f in self.files]
-        for t in threads: t.start()
-        for t in threads: t.join()
+        from concurrent.futures import ThreadPoolExecutor
+        # Blocking reads release the GIL, so a few threads saturate the link; more only split the bandwidth
+        with ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL, len(self.files) or 1)) as pool:
+            for _ in pool.map(self._dl, self.files): pass
         return True
     def _dl(self, f):
         path = self.ddir / f; url = self.base + f
+        import urllib.request
         try:
             req = urllib.request.Request(url, method='HEAD')
             with urllib.request.urlopen(req) as r: total = int(r.headers.get('content-length', 0))
             curr = path.stat().st_size if path.exists() else 0
             if curr >= total: return
-            req = urllib.request.Request(url, headers={'Range': f'bytes={curr}-'})
-            with urllib.request.urlopen(req) as r, open(path, 'ab') as out: shutil.copyfileobj(r, out)
+            req = urllib.request.Request(url, headers={'Range': f'bytes={curr}-', 'Accept-Encoding': 'identity'})
+            # Copy in 1 MiB chunks: the zips are hundreds of MiB and a 64 KiB default means thousands of tiny writes
+            with urllib.request.urlopen(req) as r, open(path, 'ab') as out: shutil.copyfileobj(r, out, self.COPY_CHUNK)
             logger.info(f"Finished {f}")
         except Exception as e: logger.error(f"Error {f}: {e}")
 
@@ -1031,11 +1324,22 @@ class Downloader:
 # Beautiful Display Logic
 # ============================================================
 
+DOSSIER_SECTIONS = ("core", "general", "history", "personnel", "ownership", "beneficiaries", "operations", "registry", "enrichment")
+ALL_DOSSIER_SECTIONS = frozenset(DOSSIER_SECTIONS)
+
+# Keys already shown in their own column, left out of the "details" column
+PERSONNEL_EXCLUDE = frozenset({"eesnimi", "nimi_arinimi", "isiku_roll_tekstina", "algus_kpv", "isikukood_registrikood", "isikukood_hash"})
+OWNERSHIP_EXCLUDE = frozenset({"eesnimi", "nimi_arinimi", "osamaksu_summa", "osaluse_suurus", "valuuta", "osaluse_valuuta",
+                               "osaluse_omandiliik_tekstina", "isikukood_registrikood", "isikukood_hash"})
+
 def display_company(item, sections=None, lang="et"):
-    lbl = UI_LABELS[lang]; to_en = (lang == "en")
-    if sections is None or "all" in sections:
-        sections = ["core", "general", "history", "personnel", "ownership", "beneficiaries", "operations", "registry", "enrichment"]
-    yld = item.get('yldandmed', {}); enrich = item.get('enrichment', {}); unmasked_ids = enrich.get('unmasked_ids', {})
+    to_en = (lang == "en"); lbl = UI_EN if to_en else UI_ET
+    tr, tv = tr_fn(to_en), tv_fn(to_en)
+    # Callers rendering many dossiers pass the same frozenset each time; frozenset() of a frozenset is free
+    sections = ALL_DOSSIER_SECTIONS if sections is None or "all" in sections else frozenset(sections)
+    yld = item.get('yldandmed', {}); enrich = item.get('enrichment', {})
+    # Keys are stored case-folded; folding again also collapses the name/NAME pairs written by older enrichments
+    unmasked_ids = {k.casefold(): v for k, v in enrich.get('unmasked_ids', {}).items()}
     def get_nested_list(key, inner_key=None):
         val = item.get(key, [])
         if not val: return []
@@ -1049,16 +1353,28 @@ def display_company(item, sections=None, lang="et"):
         exclude = exclude or []; res = []
         for k, v in d.items():
             if k in exclude or isinstance(v, (list, dict)): continue 
-            res.append(f"{' '*indent}\033[1m{TRANSLATIONS.get(k, k) if to_en else k}:\033[0m {translate_value(v, to_en)}")
+            res.append(f"{' '*indent}\033[1m{tr(k, k)}:\033[0m {tv(v)}")
         return res
+    unmasked_names = sorted(unmasked_ids); name_tokens = {}
+    for u_n in unmasked_ids:
+        for tok in u_n.split(): name_tokens.setdefault(tok, []).append(u_n)
+    def find_unmasked(needle):
+        if needle in unmasked_ids: return unmasked_ids[needle]
+        if not needle or not unmasked_names: return None
+        # Truncated names / extra given names: probe the sorted keys around the insertion point first
+        i = bisect_left(unmasked_names, needle)
+        if i < len(unmasked_names) and unmasked_names[i].startswith(needle): return unmasked_ids[unmasked_names[i]]
+        if i and needle.startswith(unmasked_names[i - 1]): return unmasked_ids[unmasked_names[i - 1]]
+        # Reordered / partial names usually share a whole token; only scan everything when none does
+        hit = next((u_n for tok in needle.split() for u_n in name_tokens.get(tok, ()) if needle in u_n or u_n in needle), None)
+        if hit: return unmasked_ids[hit]
+        return next((u_id for u_n, u_id in unmasked_ids.items() if needle in u_n or u_n in needle), None)
     def resolve_id(p):
         raw = p.get('isikukood_registrikood') or p.get('isikukood')
         if raw: return str(raw)
         name = f"{p.get('eesnimi', '')} {p.get('nimi_arinimi', '')}".strip() or p.get('isiku_nimi', '') or p.get('nimi', '')
-        for lookup in [name.strip(), name.strip().upper()]:
-            if lookup in unmasked_ids: return f"[bold green]{unmasked_ids[lookup]}[/bold green] [dim](unmasked)[/dim]"
-        for u_n, u_id in unmasked_ids.items():
-            if name.strip() in u_n or u_n in name.strip(): return f"[bold green]{u_id}[/bold green] [dim](unmasked)[/dim]"
+        u_id = find_unmasked(name.strip().casefold())
+        if u_id: return f"[bold green]{u_id}[/bold green] [dim](unmasked)[/dim]"
         h = p.get('isikukood_hash'); return f"[dim]Hash: {h[:8]}...[/dim]" if h else "[dim]N/A[/dim]"
 
     n, c = item.get('nimi', 'N/A'), item.get('ariregistri_kood', 'N/A')
@@ -1067,19 +1383,19 @@ def display_company(item, sections=None, lang="et"):
         t = Table(title=lbl["core"], box=box.ROUNDED, header_style="bold yellow", expand=True)
         t.add_column(lbl["attr"], style="cyan"); t.add_column(lbl["val"])
         for k, v in item.items():
-            if not isinstance(v, (list, dict)): t.add_row(TRANSLATIONS.get(k, k) if to_en else k, str(translate_value(v, to_en)))
+            if not isinstance(v, (list, dict)): t.add_row(tr(k, k), str(tv(v)))
         t.add_row(lbl["portal_link"], f"https://ariregister.rik.ee/est/company/{c}"); console.print(t)
     if "enrichment" in sections and enrich:
         t = Table(title=lbl["enrichment"], box=box.ROUNDED, header_style="bold green", expand=True)
         t.add_column(lbl["attr"], style="green"); t.add_column(lbl["val"])
         for k, v in enrich.items():
-            if k != "unmasked_ids": t.add_row(TRANSLATIONS.get(k, k) if to_en else k, str(v))
+            if k != "unmasked_ids": t.add_row(tr(k, k), str(v))
         t.add_row(lbl["unmasked_personal_ids"], f"{len(unmasked_ids)} {lbl['codes_unmasked']}"); console.print(t)
     if "general" in sections and yld:
         t = Table(title=lbl["general"], box=box.ROUNDED, header_style="bold yellow", expand=True)
         t.add_column(lbl["attr"], style="cyan"); t.add_column(lbl["val"])
         for k, v in yld.items():
-            if not isinstance(v, (list, dict)): t.add_row(TRANSLATIONS.get(k, k) if to_en else k, str(translate_value(v, to_en)))
+            if not isinstance(v, (list, dict)): t.add_row(tr(k, k), str(tv(v)))
         console.print(t)
     if "history" in sections and yld:
         tree = Tree(f"[bold yellow]{lbl['history']}[/bold yellow]")
@@ -1088,7 +1404,7 @@ def display_company(item, sections=None, lang="et"):
             data = yld.get(k, [])
             if data:
                 node = tree.add(f"[cyan]{label}[/cyan]")
-                for e in data: node.add(", ".join(f"[label]{TRANSLATIONS.get(key, key) if to_en else key}:[/label] {translate_value(val, to_en)}" for key, val in e.items() if not isinstance(val, (list, dict))))
+                for e in data: node.add(", ".join(f"[label]{tr(key, key)}:[/label] {tv(val)}" for key, val in e.items() if not isinstance(val, (list, dict))))
         console.print(tree)
     if "personnel" in sections:
         board = get_nested_list('isikud', 'kaardile_kantud_isikud')
@@ -1096,10 +1412,10 @@ def display_company(item, sections=None, lang="et"):
             t = Table(title=lbl["personnel"], box=box.ROUNDED, header_style="bold yellow", expand=True)
             t.add_column(lbl["name"], style="bold white"); t.add_column(lbl["id_code"], style="magenta"); t.add_column(lbl["role"]); t.add_column(lbl["since"]); t.add_column(lbl["details"], style="dim")
             for p in board:
-                t.add_row(f"{p.get('eesnimi', '')} {p.get('nimi_arinimi', '')}".strip(), resolve_id(p), translate_value(p.get('isiku_roll_tekstina', 'Member'), to_en), p.get('algus_kpv', ''), ", ".join([f"{TRANSLATIONS.get(k, k) if to_en else k}: {translate_value(v, to_en)}" for k, v in p.items() if k not in ["eesnimi", "nimi_arinimi", "isiku_roll_tekstina", "algus_kpv", "isikukood_registrikood", "isikukood_hash"] and not isinstance(v, (list, dict))]))
+                t.add_row(f"{p.get('eesnimi', '')} {p.get('nimi_arinimi', '')}".strip(), resolve_id(p), tv(p.get('isiku_roll_tekstina', 'Member')), p.get('algus_kpv', ''), ", ".join(f"{tr(k, k)}: {tv(v)}" for k, v in p.items() if k not in PERSONNEL_EXCLUDE and type(v) not in (list, dict)))
             console.print(t)
         r = get_nested_list('isikud', 'esindusoiguse_normaalregulatsioonid') + get_nested_list('isikud', 'esindusoiguse_eritingimused')
-        if r: console.print(Panel("\n".join([f"• {translate_value(x.get('sisu'), to_en)}" for x in r]), title=lbl["rights"], box=box.ROUNDED, border_style="yellow"))
+        if r: console.print(Panel("\n".join([f"• {tv(x.get('sisu'))}" for x in r]), title=lbl["rights"], box=box.ROUNDED, border_style="yellow"))
     if "ownership" in sections:
         sh = get_nested_list('osanikud', 'osanikud')
         if sh:
@@ -1107,39 +1423,40 @@ def display_company(item, sections=None, lang="et"):
             t.add_column(lbl["owner"], style="bold white"); t.add_column(lbl["id_code"], style="magenta"); t.add_column(lbl["amount"], style="green"); t.add_column(lbl["type"]); t.add_column(lbl["details"], style="dim")
             for s in sh:
                 amt = f"{s.get('osamaksu_summa') or s.get('osaluse_suurus') or '?'} {s.get('valuuta') or s.get('osaluse_valuuta') or 'EUR'}"
-                t.add_row(f"{s.get('eesnimi', '')} {s.get('nimi_arinimi', '')}".strip() or "N/A", resolve_id(s), amt, translate_value(s.get('osaluse_omandiliik_tekstina', 'Owner'), to_en), ", ".join([f"{TRANSLATIONS.get(k, k) if to_en else k}: {translate_value(v, to_en)}" for k, v in s.items() if k not in ["eesnimi", "nimi_arinimi", "osamaksu_summa", "osaluse_suurus", "valuuta", "osaluse_valuuta", "osaluse_omandiliik_tekstina", "isikukood_registrikood", "isikukood_hash"] and not isinstance(v, (list, dict))]))
+                t.add_row(f"{s.get('eesnimi', '')} {s.get('nimi_arinimi', '')}".strip() or "N/A", resolve_id(s), amt, tv(s.get('osaluse_omandiliik_tekstina', 'Owner')), ", ".join(f"{tr(k, k)}: {tv(v)}" for k, v in s.items() if k not in OWNERSHIP_EXCLUDE and type(v) not in (list, dict)))
             console.print(t)
     if "beneficiaries" in sections:
         ben = get_nested_list('kasusaajad', 'kasusaajad')
         if ben:
             t = Table(title=lbl["beneficiaries"], box=box.ROUNDED, header_style="bold yellow", expand=True)
             t.add_column(lbl["name"], style="bold white"); t.add_column(lbl["id_code"], style="magenta"); t.add_column(lbl["control"]); t.add_column(lbl["address"])
-            for b in ben: t.add_row(f"{b.get('eesnimi', '')} {b.get('nimi', '')}".strip() or "N/A", resolve_id(b), translate_value(b.get('kontrolli_teostamise_viis_tekstina', 'Control'), to_en), translate_value(b.get('aadress_riik_tekstina', 'N/A'), to_en))
+            for b in ben: t.add_row(f"{b.get('eesnimi', '')} {b.get('nimi', '')}".strip() or "N/A", resolve_id(b), tv(b.get('kontrolli_teostamise_viis_tekstina', 'Control')), tv(b.get('aadress_riik_tekstina', 'N/A')))
             console.print(t)
     if "operations" in sections:
         a_l, r_l, side = yld.get('teatatud_tegevusalad', []), yld.get('info_majandusaasta_aruannetest', []), yld.get('sidevahendid', [])
         c1 = Table(title=lbl["activities"], box=box.SIMPLE); c1.add_column("Code"); c1.add_column(lbl["name"]); c1.add_column(lbl["main"])
-        for a in a_l: c1.add_row(a.get('emtak_kood'), translate_value(a.get('emtak_tekstina'), to_en), "✓" if a.get('on_pohitegevusala') else "")
+        for a in a_l: c1.add_row(a.get('emtak_kood'), tv(a.get('emtak_tekstina')), "✓" if a.get('on_pohitegevusala') else "")
         c2 = Table(title=lbl["reports"], box=box.SIMPLE); c2.add_column(lbl["period_end"]); c2.add_column(lbl["employees"]); c2.add_column(lbl["activity"])
-        for r in r_l: c2.add_row(r.get('majandusaasta_perioodi_lopp_kpv', 'N/A'), str(r.get('tootajate_arv', '0')), translate_value(r.get('tegevusala_emtak_tekstina', 'N/A'), to_en))
+        for r in r_l: c2.add_row(r.get('majandusaasta_perioodi_lopp_kpv', 'N/A'), str(r.get('tootajate_arv', '0')), tv(r.get('tegevusala_emtak_tekstina', 'N/A')))
         c3 = Table(title=lbl["contacts"], box=box.SIMPLE); c3.add_column(lbl["type"]); c3.add_column(lbl["val"])
-        for s in side: c3.add_row(translate_value(s.get('liik_tekstina', 'Contact'), to_en), s.get('sisu'))
+        for s in side: c3.add_row(tv(s.get('liik_tekstina', 'Contact')), s.get('sisu'))
         console.print(Columns([c1, c2, c3], expand=True))
     if "registry" in sections:
         t = Table(title=lbl["registry"], box=box.ROUNDED, header_style="bold yellow", expand=True)
         t.add_column(lbl["date"], style="cyan"); t.add_column(lbl["entry_type"]); t.add_column(lbl["entry_num"], justify="right")
         for card in get_nested_list('kaardid', 'registrikaardid'):
-            for k in card.get('kanded', []): t.add_row(k.get('kpv'), translate_value(k.get('kandeliik_tekstina'), to_en), f"#{k.get('kande_nr')}")
+            for k in card.get('kanded', []): t.add_row(k.get('kpv'), tv(k.get('kandeliik_tekstina')), f"#{k.get('kande_nr')}")
         console.print(t)
     console.print(f"\n[dim]{lbl['privacy_note']}[/dim]")
 
 def display_stats(stats, lang="et"):
-    lbl = UI_LABELS[lang]; to_en = (lang == "en")
+    to_en = (lang == "en"); lbl = UI_EN if to_en else UI_ET
     title = lbl.get("stats_title", "Database Statistics" if to_en else "Andmebaasi statistika")
     t = Table(title=title, box=box.ROUNDED, header_style="bold yellow", expand=True)
     t.add_column(lbl["attr"], style="cyan"); t.add_column(lbl["val"], justify="right")
     total = stats["total"]
-    def pct(n): return f"{n:,} ({n/total*100:.1f}%)" if total else "0"
+    inv = 100.0 / total if total else 0.0; fmt = "{:,} ({:.1f}%)".format
+    def pct(n): return fmt(n, n * inv) if total else "0"
     t.add_row("Total companies" if to_en else "Ettevotteid kokku", f"{total:,}")
     t.add_row("With status" if to_en else "Staatusega", pct(stats["has_status"]))
     t.add_row("With county" if to_en else "Maakonnaga", pct(stats["has_county"]))
@@ -1167,88 +1484,75 @@ def display_stats(stats, lang="et"):
             t3.add_row(translate_value(name, to_en) if name else "N/A", f"{cnt:,}")
         console.print(t3)
 
+def _top2_emp(reports):
+    """Employee counts of the two most recent annual reports that have one, as (latest, previous).
+
+    Single pass; ties on the period end date keep list order, like a stable descending sort would."""
+    d1 = d2 = e1 = e2 = None
+    for r in reports:
+        emp = r.get('tootajate_arv')
+        if emp is None:
+            continue
+        try:
+            emp = int(emp)
+        except (ValueError, TypeError):
+            continue
+        d = r.get('majandusaasta_perioodi_lopp_kpv', '')
+        if e1 is None or d > d1:
+            d2, e2 = d1, e1; d1, e1 = d, emp
+        elif e2 is None or d > d2:
+            d2, e2 = d, emp
+    return e1, e2
+
 def get_latest_employees(item):
     """Extract latest employee count from annual reports."""
-    reports = item.get('yldandmed', {}).get('info_majandusaasta_aruannetest', [])
+    reports = item.get('yldandmed', {}).get('info_majandusaasta_aruannetest')
     if not reports:
         return None
-    # Sort by period end date descending, take latest
-    sorted_reports = sorted(reports, key=lambda r: r.get('majandusaasta_perioodi_lopp_kpv', ''), reverse=True)
-    for r in sorted_reports:
-        emp = r.get('tootajate_arv')
-        if emp is not None:
-            try:
-                return int(emp)
-            except (ValueError, TypeError):
-                pass
-    return None
+    if len(reports) == 1:
+        emp = reports[0].get('tootajate_arv')
+        try:
+            return None if emp is None else int(emp)
+        except (ValueError, TypeError):
+            return None
+    return _top2_emp(reports)[0]
 
 def get_main_activity(item):
     """Extract main activity description from EMTAK data."""
-    activities = item.get('yldandmed', {}).get('teatatud_tegevusalad', [])
+    return _main_activity(item.get('yldandmed', {}))
+
+def _main_activity(yld):
+    activities = yld.get('teatatud_tegevusalad')
     if not activities:
         return ""
-    for a in activities:
-        if a.get('on_pohitegevusala'):
-            code = a.get('emtak_kood', '')
-            desc = a.get('emtak_tekstina', '')
-            return f"{code} {desc}".strip()
-    # fallback: first activity
-    a = activities[0]
+    # main activity, falling back to the first one
+    a = activities[0] if len(activities) == 1 else next((a for a in activities if a.get('on_pohitegevusala')), activities[0])
     return f"{a.get('emtak_kood', '')} {a.get('emtak_tekstina', '')}".strip()
 
-def filter_by_employees(results, min_employees=None, max_employees=None):
-    """Post-filter search results by employee count."""
-    for item in results:
-        emp = get_latest_employees(item)
-        if min_employees is not None and (emp is None or emp < min_employees):
-            continue
-        if max_employees is not None and (emp is not None and emp > max_employees):
-            continue
-        yield item
-
-def filter_growing(results):
-    """Post-filter: only companies where latest employee_count > previous year's."""
-    for item in results:
-        reports = item.get('yldandmed', {}).get('info_majandusaasta_aruannetest', [])
-        if len(reports) < 2:
-            continue
-        sorted_reports = sorted(reports, key=lambda r: r.get('majandusaasta_perioodi_lopp_kpv', ''), reverse=True)
-        latest = prev = None
-        for r in sorted_reports:
-            emp = r.get('tootajate_arv')
-            if emp is not None:
-                try:
-                    val = int(emp)
-                except (TypeError, ValueError):
-                    continue
-                if latest is None:
-                    latest = val
-                elif prev is None:
-                    prev = val
-                    break
-        if latest is not None and prev is not None and latest > prev:
-            yield item
+STATUS_SHORT = {
+    "Registrisse kantud": "Active", "Entered into register": "Active",
+    "Kustutatud": "Deleted", "Deleted": "Deleted",
+    "Likvideerimisel": "Liquidating", "In liquidation": "Liquidating",
+    "Pankrotis": "Bankrupt", "Bankrupt": "Bankrupt",
+    "Registrist kustutatud": "Deleted", "Deleted from register": "Deleted",
+}
+_STATUS_SHORT_CACHE = dict(STATUS_SHORT)
 
 def shorten_status(status, to_en=False):
     """Shorten status labels for compact display."""
-    status_map = {
-        "Registrisse kantud": "Active", "Entered into register": "Active",
-        "Kustutatud": "Deleted", "Deleted": "Deleted",
-        "Likvideerimisel": "Liquidating", "In liquidation": "Liquidating",
-        "Pankrotis": "Bankrupt", "Bankrupt": "Bankrupt",
-        "Registrist kustutatud": "Deleted", "Deleted from register": "Deleted",
-    }
     if not status:
         return "Unknown"
-    for key, short in status_map.items():
-        if key in status:
-            return short
-    return status[:20]
+    try:
+        return _STATUS_SHORT_CACHE[status]
+    except KeyError:
+        # e.g. translated "Entered into register (Registrisse kantud)": substring match once, then cache
+        short = next((v for k, v in STATUS_SHORT.items() if k in status), status[:20])
+        _STATUS_SHORT_CACHE[status] = short
+        return short
 
 def display_company_summary(items, lang="et"):
     """Display companies as a compact summary table (one row per company)."""
-    lbl = UI_LABELS[lang]; to_en = (lang == "en")
+    to_en = (lang == "en"); lbl = UI_EN if to_en else UI_ET
     t = Table(title="Companies" if to_en else "Ettevotted", box=box.ROUNDED, header_style="bold yellow", expand=True)
     t.add_column("Name" if to_en else "Nimi", style="bold white", max_width=35)
     t.add_column("Code" if to_en else "Kood", style="cyan", justify="right")
@@ -1258,104 +1562,108 @@ def display_company_summary(items, lang="et"):
     t.add_column("Emp" if to_en else "Toot", justify="right", style="green")
     t.add_column("Founded" if to_en else "Asutatud", style="dim")
     t.add_column("Status" if to_en else "Staatus")
-    count = 0
+    count = 0; add_row = t.add_row; latest_capital = SQLiteBackend._extract_latest_capital
     for item in items:
-        count += 1
-        name = item.get('nimi', 'N/A')
-        code = str(item.get('ariregistri_kood', ''))
-        county = item.get('asukoha_ehak_tekstina', '')
+        count += 1; get = item.get
+        yld = get('yldandmed', {}); yget = yld.get
+        name = get('nimi', 'N/A')
+        code = str(get('ariregistri_kood', ''))
+        county = get('asukoha_ehak_tekstina', '')
         if county:
-            parts = [p.strip() for p in county.split(',')]
-            county = next((p for p in reversed(parts) if 'maakond' in p), parts[-1] if parts else '')
-        activity = get_main_activity(item)
+            # The county is almost always the last EHAK component; only split when it is not
+            last = county[county.rfind(',') + 1:].strip()
+            if 'maakond' in last or 'maakond' not in county:
+                county = last
+            else:
+                county = next(p for p in reversed([p.strip() for p in county.split(',')]) if 'maakond' in p)
+        activity = _main_activity(yld)
         if len(activity) > 30:
             activity = activity[:27] + "..."
         # Capital from yldandmed
-        cap_amt, cap_cur = SQLiteBackend._extract_latest_capital(item)
+        cap_amt, cap_cur = latest_capital(item)
         if cap_amt is not None:
             cap_str = f"{cap_amt:,.0f}" if cap_amt == int(cap_amt) else f"{cap_amt:,.2f}"
         else:
             cap_str = "-"
-        emp = get_latest_employees(item)
+        emp = _top2_emp(yget('info_majandusaasta_aruannetest', ()))[0]
         emp_str = str(emp) if emp is not None else "-"
-        founded = item.get('yldandmed', {}).get('esmaregistreerimise_kpv', '') or ''
+        founded = yget('esmaregistreerimise_kpv', '') or ''
         if founded and len(founded) >= 10:
             founded = founded[:10]
-        status = item.get('yldandmed', {}).get('staatus_tekstina', '') or item.get('ettevotja_staatus_tekstina', '') or ''
+        status = yget('staatus_tekstina', '') or get('ettevotja_staatus_tekstina', '') or ''
         status = shorten_status(status, to_en)
-        t.add_row(name, code, county, activity, cap_str, emp_str, founded, status)
+        add_row(name, code, county, activity, cap_str, emp_str, founded, status)
     console.print(t)
     console.print(f"\n[success]{'Found' if to_en else 'Leitud'}: {count} {'companies' if to_en else 'ettevottet'}[/success]")
     return count
 
-def display_industry_list(lang="et"):
-    """Display all available industry names grouped by category."""
-    to_en = (lang == "en")
-    categories = {
-        "IT & Technology": ["software", "it", "tech", "programming", "consulting", "it consulting", "data processing", "hosting", "web", "telecom"],
-        "Manufacturing": ["manufacturing", "food manufacturing", "beverages", "textiles", "clothing", "wood", "paper", "printing", "chemicals", "pharmaceuticals", "plastics", "metals", "electronics", "machinery", "automotive", "furniture"],
-        "Construction": ["construction", "building", "civil engineering", "renovation", "plumbing", "electrical"],
-        "Trade & Retail": ["retail", "wholesale", "trade", "e-commerce", "car sales", "grocery"],
-        "Food & Hospitality": ["restaurant", "food", "catering", "hotel", "accommodation", "hospitality", "bar", "cafe"],
-        "Transport & Logistics": ["transport", "logistics", "warehousing", "trucking", "freight", "taxi", "courier", "shipping", "aviation"],
-        "Real Estate": ["real estate", "property", "rental"],
-        "Finance & Insurance": ["finance", "banking", "insurance", "investment", "fintech"],
-        "Professional Services": ["legal", "law", "accounting", "audit", "management consulting", "architecture", "engineering", "design", "advertising", "marketing", "research", "translation"],
-        "Healthcare": ["healthcare", "medical", "dental", "pharmacy", "veterinary"],
-        "Education": ["education", "training", "school"],
-        "Agriculture": ["agriculture", "farming", "forestry", "fishing"],
-        "Energy & Mining": ["energy", "electricity", "mining", "oil", "gas"],
-        "Media & Entertainment": ["media", "publishing", "film", "tv", "gaming", "music"],
-        "Other Services": ["cleaning", "security", "staffing", "recruitment", "beauty", "hairdressing", "fitness", "sports", "waste", "recycling", "ngo", "nonprofit"],
-    }
+INDUSTRY_CATEGORIES = {
+    "IT & Technology": ["software", "it", "tech", "programming", "consulting", "it consulting", "data processing", "hosting", "web", "telecom"],
+    "Manufacturing": ["manufacturing", "food manufacturing", "beverages", "textiles", "clothing", "wood", "paper", "printing", "chemicals", "pharmaceuticals", "plastics", "metals", "electronics", "machinery", "automotive", "furniture"],
+    "Construction": ["construction", "building", "civil engineering", "renovation", "plumbing", "electrical"],
+    "Trade & Retail": ["retail", "wholesale", "trade", "e-commerce", "car sales", "grocery"],
+    "Food & Hospitality": ["restaurant", "food", "catering", "hotel", "accommodation", "hospitality", "bar", "cafe"],
+    "Transport & Logistics": ["transport", "logistics", "warehousing", "trucking", "freight", "taxi", "courier", "shipping", "aviation"],
+    "Real Estate": ["real estate", "property", "rental"],
+    "Finance & Insurance": ["finance", "banking", "insurance", "investment", "fintech"],
+    "Professional Services": ["legal", "law", "accounting", "audit", "management consulting", "architecture", "engineering", "design", "advertising", "marketing", "research", "translation"],
+    "Healthcare": ["healthcare", "medical", "dental", "pharmacy", "veterinary"],
+    "Education": ["education", "training", "school"],
+    "Agriculture": ["agriculture", "farming", "forestry", "fishing"],
+    "Energy & Mining": ["energy", "electricity", "mining", "oil", "gas"],
+    "Media & Entertainment": ["media", "publishing", "film", "tv", "gaming", "music"],
+    "Other Services": ["cleaning", "security", "staffing", "recruitment", "beauty", "hairdressing", "fitness", "sports", "waste", "recycling", "ngo", "nonprofit"],
+}
+
+@lru_cache(maxsize=None)
+def _industry_tree(to_en):
+    # Categories and INDUSTRY_MAP are fixed, so the tree is built once per language and reused
     title = "Available Industries" if to_en else "Saadaolevad tegevusalad"
     tree = Tree(f"[bold blue]{title}[/bold blue]")
-    for cat, names in categories.items():
+    for cat, names in INDUSTRY_CATEGORIES.items():
         node = tree.add(f"[bold yellow]{cat}[/bold yellow]")
         for name in names:
-            codes = INDUSTRY_MAP.get(name, [])
-            node.add(f"[cyan]{name}[/cyan] -> EMTAK {', '.join(codes)}")
-    console.print(tree)
+            node.add(f"[cyan]{name}[/cyan] -> EMTAK {', '.join(INDUSTRY_MAP.get(name, []))}")
+    return tree
+
+def display_industry_list(lang="et"):
+    """Display all available industry names grouped by category."""
+    console.print(_industry_tree(lang == "en"))
 
 def export_csv(db, output_path, lang="et", emtak=None, location=None, status=None,
                legal_form=None, founded_after=None, founded_before=None,
                min_employees=None, max_employees=None, limit=None,
-               min_capital=None, max_capital=None, has_email=False, has_phone=False, has_website=False):
-    """Export filtered companies to CSV with flattened columns."""
+               min_capital=None, max_capital=None, has_email=False, has_phone=False, has_website=False, rows=None):
+    """Export filtered companies to CSV with flattened columns.
+
+    Pass already-fetched company dicts as `rows` to write them as-is instead of querying `db` again."""
     to_en = (lang == "en")
-    results = db.search(emtak=emtak, location=location, status=status,
+    results = rows if rows is not None else db.search(emtak=emtak, location=location, status=status,
                         legal_form=legal_form, founded_after=founded_after,
                         founded_before=founded_before, limit=limit,
                         min_capital=min_capital, max_capital=max_capital,
-                        has_email=has_email, has_phone=has_phone, has_website=has_website)
-    if min_employees or max_employees:
-        results = filter_by_employees(results, min_employees, max_employees)
-
-    headers = ["code", "name", "status", "county", "city", "legal_form", "founded",
-               "main_industry_code", "main_industry_name", "employees", "capital", "capital_currency",
-               "vat_number", "email", "phone", "website"]
-
+                        has_email=has_email, has_phone=has_phone, has_website=has_website,
+                        min_employees=min_employees, max_employees=max_employees)
     count = 0
-    with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
+
+    def _rows(results):
+        nonlocal count
+        extract_capital = SQLiteBackend._extract_latest_capital
         for item in results:
-            count += 1
-            yld = item.get('yldandmed', {})
+            get = item.get; yld = get('yldandmed', {}); yget = yld.get
+            emp = _top2_emp(yget('info_majandusaasta_aruannetest', ()))[0]
             # Extract contacts
-            contacts = yld.get('sidevahendid', [])
             email = phone = website = ""
-            for c in contacts:
-                ctype = c.get('liik_tekstina', '')
-                val = c.get('sisu', '')
-                if 'mail' in ctype.lower() or 'post' in ctype.lower():
-                    email = email or val
-                elif 'telefon' in ctype.lower() or 'mobiil' in ctype.lower():
-                    phone = phone or val
-                elif 'www' in ctype.lower() or 'internet' in ctype.lower():
-                    website = website or val
+            for c in yget('sidevahendid', []):
+                kind = contact_kind(c.get('liik_tekstina'))
+                if kind == 'email':
+                    email = email or c.get('sisu', '')
+                elif kind == 'phone':
+                    phone = phone or c.get('sisu', '')
+                elif kind == 'website':
+                    website = website or c.get('sisu', '')
             # Extract main activity
-            activities = yld.get('teatatud_tegevusalad', [])
+            activities = yget('teatatud_tegevusalad', [])
             main_code = main_name = ""
             for a in activities:
                 if a.get('on_pohitegevusala'):
@@ -1366,31 +1674,53 @@ def export_csv(db, output_path, lang="et", emtak=None, location=None, status=Non
                 main_code = activities[0].get('emtak_kood', '')
                 main_name = activities[0].get('emtak_tekstina', '')
             # County/city from ehak
-            ehak = item.get('asukoha_ehak_tekstina', '')
+            ehak = get('asukoha_ehak_tekstina', '')
             county = city = ""
             if ehak:
                 parts = [p.strip() for p in ehak.split(',')]
                 county = next((p for p in reversed(parts) if 'maakond' in p), '')
                 city = next((p for p in parts if 'linn' in p or 'vald' in p), '')
 
-            emp = get_latest_employees(item)
-            status_val = yld.get('staatus_tekstina', '') or item.get('ettevotja_staatus_tekstina', '')
+            status_val = yget('staatus_tekstina', '') or get('ettevotja_staatus_tekstina', '')
             if to_en:
                 status_val = translate_value(status_val, True)
                 main_name = translate_value(main_name, True)
 
-            cap_amt, cap_cur = SQLiteBackend._extract_latest_capital(item)
-            writer.writerow([
-                item.get('ariregistri_kood', ''), item.get('nimi', ''), status_val,
-                county, city, item.get('ettevotja_oiguslik_vorm', ''),
-                yld.get('esmaregistreerimise_kpv', '') or item.get('ettevotja_esmakande_kpv', ''),
+            cap_amt, cap_cur = extract_capital(item)
+            count += 1
+            yield (
+                get('ariregistri_kood', ''), get('nimi', ''), status_val,
+                county, city, get('ettevotja_oiguslik_vorm', ''),
+                yget('esmaregistreerimise_kpv', '') or get('ettevotja_esmakande_kpv', ''),
                 main_code, main_name, emp if emp is not None else '',
                 cap_amt if cap_amt is not None else '', cap_cur or '',
-                item.get('kmkr_nr', ''),
+                get('kmkr_nr', ''),
                 email, phone, website
-            ])
+            )
+
+    headers = ["code", "name", "status", "county", "city", "legal_form", "founded",
+               "main_industry_code", "main_industry_name", "employees", "capital", "capital_currency",
+               "vat_number", "email", "phone", "website"]
+
+    # Binary handle + explicit BOM + large text buffer; writerows drives the row generator from C
+    with open(output_path, 'wb', buffering=1 << 20) as fh:
+        fh.write(codecs.BOM_UTF8)
+        f = io.TextIOWrapper(fh, encoding='utf-8', newline='', write_through=False)
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(_rows(results))
+        f.flush(); f.detach()
     console.print(f"[success]Exported {count} companies to {output_path}[/success]")
 
+def dump_json_array(items, fp):
+    """Stream an iterable to fp as a JSON array laid out like dumps_pretty(list(items))."""
+    pad = "\n  "; count = 0
+    for item in items:
+        fp.write(("[" if count == 0 else ",") + pad + dumps_pretty(item).replace("\n", pad))
+        count += 1
+    fp.write("\n]" if count else "[]")
+    return count
+
 def cmd_report(db, report_type, lang="et", **kwargs):
     """Execute a pre-built business report."""
     to_en = (lang == "en")
@@ -1462,15 +1792,17 @@ def cmd_report(db, report_type, lang="et", **kwargs):
         console.print(f"\n[bold blue]{title}[/bold blue]\n")
         fa = f"{period}-01-01" if period else None
         fb = f"{period}-12-31" if period else None
-        for st in ["Likvideerimisel", "Pankrotis"]:
-            results = db.analyze(by="emtak", status=st, founded_after=fa, founded_before=fb, top=10)
+        statuses = ["Likvideerimisel", "Pankrotis"]
+        grouped = db.analyze_multi(("emtak", "county"), statuses, founded_after=fa, founded_before=fb, top=10)
+        for st in statuses:
+            results = grouped[(st, "emtak")]
             if results:
                 st_label = translate_value(st, to_en)
                 console.print(f"\n[bold yellow]{st_label}[/bold yellow]")
                 display_analysis(results, by="emtak", lang=lang)
         console.print()
-        for st in ["Likvideerimisel", "Pankrotis"]:
-            results = db.analyze(by="county", status=st, founded_after=fa, founded_before=fb, top=10)
+        for st in statuses:
+            results = grouped[(st, "county")]
             if results:
                 st_label = translate_value(st, to_en)
                 console.print(f"\n[bold yellow]{st_label} - {'by county' if to_en else 'maakonniti'}[/bold yellow]")
@@ -1524,23 +1856,21 @@ def display_person_network(results, name=None, lang="et"):
     title = f"{'Network' if to_en else 'Voorgustik'}: {name or results[0].get('full_name', 'Unknown')}"
     tree = Tree(f"[bold blue]{title}[/bold blue]")
     # Group by source
-    by_source = defaultdict(list)
+    by_source = {}
     for r in results:
-        by_source[r['source']].append(r)
-    source_labels = {'board': 'Board Member' if to_en else 'Juhatuse liige',
-                     'shareholder': 'Shareholder' if to_en else 'Osanik',
-                     'beneficiary': 'Beneficiary' if to_en else 'Kasusaaja'}
+        by_source.setdefault(r['source'], []).append(r)
+    source_labels = (UI_EN if to_en else UI_ET)["person_sources"]
+    green_pct = " [green]{:.1f}%[/green]".format
     for src, items in by_source.items():
         node = tree.add(f"[bold yellow]{source_labels.get(src, src)}[/bold yellow] ({len(items)})")
         for r in items:
-            status = r.get('company_status', '')
+            g = r.get
+            status, pct, role = g('company_status', ''), g('ownership_pct'), g('role')
             status_tag = f" [dim]({shorten_status(status, to_en)})[/dim]" if status else ""
-            detail = ""
-            if r.get('ownership_pct'):
-                detail = f" [green]{r['ownership_pct']:.1f}%[/green]"
-            elif r.get('role'):
-                detail = f" [dim]{translate_value(r['role'], to_en)}[/dim]"
-            node.add(f"[cyan]{r.get('company_name', 'N/A')}[/cyan] ({r.get('company_code', '')}){detail}{status_tag}")
+            if pct: detail = green_pct(pct)
+            elif role: detail = f" [dim]{translate_value(role, to_en)}[/dim]"
+            else: detail = ""
+            node.add(f"[cyan]{g('company_name', 'N/A')}[/cyan] ({g('company_code', '')}){detail}{status_tag}")
     console.print(tree)
 
 def display_group_tree(group_data, lang="et"):
@@ -1551,26 +1881,33 @@ def display_group_tree(group_data, lang="et"):
         return
     title = f"{'Corporate Group' if to_en else 'Kontsern'}: {company.get('name', 'N/A')} ({company.get('code', '')})"
     tree = Tree(f"[bold blue]{title}[/bold blue]")
+    green_pct = " [green]{:.1f}%[/green]".format
     parents = group_data.get("parents", [])
     if parents:
         pnode = tree.add(f"[bold yellow]{'Shareholders (owners)' if to_en else 'Osanikud (omanikud)'}[/bold yellow]")
         for p in parents:
-            pct = f" [green]{p['ownership_pct']:.1f}%[/green]" if p.get('ownership_pct') else ""
+            pct = green_pct(p['ownership_pct']) if p.get('ownership_pct') else ""
             amt = f" ({p.get('contribution_amount', '')}{' ' + p.get('currency', '') if p.get('currency') else ''})" if p.get('contribution_amount') else ""
             pnode.add(f"{p.get('full_name', 'N/A')} [dim]({p.get('id_code', '-')})[/dim]{pct}{amt}")
     subs = group_data.get("subsidiaries", [])
     if subs:
         snode = tree.add(f"[bold yellow]{'Subsidiaries' if to_en else 'Tutarettevotted'}[/bold yellow]")
-        # Build tree by depth
-        depth_nodes = {0: snode}
-        for s in sorted(subs, key=lambda x: x.get('depth', 1)):
-            depth = s.get('depth', 1)
-            parent = depth_nodes.get(depth - 1, snode)
-            pct = f" [green]{s['ownership_pct']:.1f}%[/green]" if s.get('ownership_pct') else ""
+        # Build tree by depth; depths are small ints >= 1, so the latest node per depth lives in a list
+        for s in subs: s.setdefault('depth', 1)
+        subs = sorted(subs, key=itemgetter('depth'))
+        depth_nodes = [snode] + [None] * subs[-1]['depth']
+        for s in subs:
+            depth = s['depth']
+            parent = depth_nodes[depth - 1] or snode
+            pct = green_pct(s['ownership_pct']) if s.get('ownership_pct') else ""
             n = parent.add(f"[cyan]{s.get('company_name', 'N/A')}[/cyan] ({s.get('company_code', '')}){pct}")
             depth_nodes[depth] = n
     console.print(tree)
 
+# Trend cell formatters keyed by the sign of the change (green up, red down, plain when flat)
+_TREND_PCT_FMT = {1: "[green]{:+.1f}%[/green]".format, -1: "[red]{:+.1f}%[/red]".format, 0: "{:+.1f}%".format}
+_TREND_CHG_FMT = {1: "[green]+{}[/green]".format, -1: "[red]{}[/red]".format, 0: "{}".format}
+
 def display_employee_trend(trend, code=None, lang="et"):
     to_en = (lang == "en")
     title = "Employee Trend" if to_en else "Tootajate trend"
@@ -1588,6 +1925,7 @@ def display_employee_trend(trend, code=None, lang="et"):
     has_companies = 'companies' in trend[0]
     if has_companies:
         t.add_column("Companies" if to_en else "Ettevotteid", justify="right", style="dim")
+    pct_fmt, chg_fmt, fmt_n = _TREND_PCT_FMT, _TREND_CHG_FMT, "{:,}".format
     prev = None
     for entry in trend:
         emp = entry['employees']
@@ -1595,21 +1933,22 @@ def display_employee_trend(trend, code=None, lang="et"):
         pct_change = ""
         if prev is not None:
             diff = emp - prev
-            change = f"+{diff}" if diff > 0 else str(diff)
             if prev > 0:
-                pct = (diff / prev) * 100
-                color = "green" if pct > 0 else "red" if pct < 0 else ""
-                pct_change = f"[{color}]{pct:+.1f}%[/{color}]" if color else f"{pct:+.1f}%"
-                change = f"[{color}]{change}[/{color}]" if color else change
-        row = [entry['year'], f"{emp:,}", change, pct_change]
+                sign = (diff > 0) - (diff < 0)
+                pct_change = pct_fmt[sign]((diff / prev) * 100); change = chg_fmt[sign](diff)
+            else:
+                change = f"+{diff}" if diff > 0 else str(diff)
+        row = [entry['year'], fmt_n(emp), change, pct_change]
         if has_companies:
-            row.append(f"{entry.get('companies', 0):,}")
+            row.append(fmt_n(entry.get('companies', 0)))
         t.add_row(*row)
         prev = emp
     console.print(t)
 
+_BAR_FULL, _BAR_EMPTY = "#" * 50, "." * 50
+
 def display_analysis(results, by, lang="et"):
-    lbl = UI_LABELS[lang]; to_en = (lang == "en")
+    to_en = (lang == "en"); lbl = UI_EN if to_en else UI_ET
     by_label = lbl["analysis_by"].get(by, by)
     title = f"{lbl['analysis_title']}: {by_label}"
     if not results:
@@ -1623,7 +1962,7 @@ def display_analysis(results, by, lang="et"):
     for i, (grp, cnt) in enumerate(results, 1):
         pct = (cnt / total * 100) if total else 0
         bar_len = int(pct / 2)
-        bar = f"{'#' * bar_len}{'.' * (50 - bar_len)} {pct:.1f}%"
+        bar = f"{_BAR_FULL[:bar_len]}{_BAR_EMPTY[bar_len:]} {pct:.1f}%"
         display_grp = translate_value(grp, to_en) if grp else "N/A"
         t.add_row(str(i), str(display_grp), f"{cnt:,}", bar)
     console.print(t)
@@ -1633,28 +1972,28 @@ def display_analysis(results, by, lang="et"):
 # Main
 # ============================================================
 
-def main():
-    parser = argparse.ArgumentParser(description="Estonian Registry CLI - Business Intelligence for Estonian Companies")
-    parser.add_argument("--no-db", action="store_true")
-    parser.add_argument("--en", action="store_true"); parser.add_argument("--ee", action="store_true"); parser.add_argument("-v", "--verbose", action="store_true")
-    parser.add_argument("--list-industries", action="store_true", help="Show all available industry names")
-    sub = parser.add_subparsers(dest="cmd")
+# CLI command names: Estonian alias -> English command
+CMD_ALIASES = {"otsi": "search", "rikasta": "enrich", "ühenda": "merge", "sünk": "sync", "ekspordi": "export", "analüüs": "analyze",
+               "statistika": "stats", "leia": "find", "aruanne": "report", "isik": "person", "kontsern": "group"}
+ET_CMDS, EN_CMDS = frozenset(CMD_ALIASES), frozenset(CMD_ALIASES.values())
 
-    # Core commands
-    for n, al in {"sync": ["sünk"], "merge": ["ühenda"]}.items():
-        sp = sub.add_parser(n, aliases=al); sp.add_argument("--force", action="store_true")
-    sub.add_parser("enrich", aliases=["rikasta"]).add_argument("codes", nargs="+")
-    sub.add_parser("stats", aliases=["statistika"])
+# Core commands
+def _build_sync(sub): sub.add_parser("sync", aliases=["sünk"]).add_argument("--force", action="store_true")
+def _build_merge(sub): sub.add_parser("merge", aliases=["ühenda"]).add_argument("--force", action="store_true")
+def _build_enrich(sub): sub.add_parser("enrich", aliases=["rikasta"]).add_argument("codes", nargs="+")
+def _build_stats(sub): sub.add_parser("stats", aliases=["statistika"])
 
-    # Search command (detailed dossier view)
+# Search command (detailed dossier view)
+def _build_search(sub):
     srch = sub.add_parser("search", aliases=["otsi"])
     srch.add_argument("term", nargs="?"); srch.add_argument("-l", "--location"); srch.add_argument("-s", "--status"); srch.add_argument("-p", "--person")
     srch.add_argument("--emtak"); srch.add_argument("--industry"); srch.add_argument("--founded-after"); srch.add_argument("--founded-before"); srch.add_argument("--legal-form")
     srch.add_argument("--json", action="store_true"); srch.add_argument("-t", "--translate", action="store_true"); srch.add_argument("--limit", type=int, default=5)
-    for s in ["core", "general", "history", "personnel", "ownership", "beneficiaries", "operations", "registry", "enrichment"]:
+    for s in DOSSIER_SECTIONS:
         srch.add_argument(f"--{s}", action="append_const", dest="sections", const=s)
 
-    # Find command (compact business-user search)
+# Find command (compact business-user search)
+def _build_find(sub):
     fnd = sub.add_parser("find", aliases=["leia"], help="Find companies with simple filters")
     fnd.add_argument("query", nargs="?", help="Company name or code")
     fnd.add_argument("--industry", help="Industry name (e.g., software, construction, restaurant)")
@@ -1676,14 +2015,16 @@ def main():
     fnd.add_argument("--json", action="store_true", help="Output as JSON")
     fnd.add_argument("--csv", help="Export results to CSV file")
 
-    # Analyze command
+# Analyze command
+def _build_analyze(sub):
     anl = sub.add_parser("analyze", aliases=["analüüs"])
     anl.add_argument("--by", required=True, choices=["county", "status", "legal-form", "emtak", "year", "capital-range", "employee-range", "role", "country"])
     anl.add_argument("--emtak"); anl.add_argument("--industry"); anl.add_argument("--location"); anl.add_argument("--status"); anl.add_argument("--legal-form")
     anl.add_argument("--founded-after"); anl.add_argument("--founded-before")
     anl.add_argument("--top", type=int, default=20); anl.add_argument("--json", action="store_true")
 
-    # Person command
+# Person command
+def _build_person(sub):
     per = sub.add_parser("person", aliases=["isik"], help="Search persons across all companies")
     per.add_argument("name", nargs="?", help="Person name to search")
     per.add_argument("--id", dest="id_code", help="Person or company ID code (exact)")
@@ -1693,13 +2034,15 @@ def main():
     per.add_argument("--network", action="store_true", help="Show all companies for this person")
     per.add_argument("--limit", type=int, default=50)
 
-    # Group command
+# Group command
+def _build_group(sub):
     grp = sub.add_parser("group", aliases=["kontsern"], help="Corporate ownership chain mapping")
     grp.add_argument("code", help="Company registry code")
     grp.add_argument("--direction", choices=["up", "down", "both"], default="both", help="Direction: up (owners), down (subsidiaries), both")
     grp.add_argument("--depth", type=int, default=5, help="Max recursion depth")
 
-    # Report command (pre-built business reports)
+# Report command (pre-built business reports)
+def _build_report(sub):
     rpt = sub.add_parser("report", aliases=["aruanne"], help="Pre-built business intelligence reports")
     rpt.add_argument("type", choices=["market-overview", "new-companies", "top-industries", "industry-growth", "regional", "bankruptcies", "employee-trend"])
     rpt.add_argument("--period", help="Year for time-based reports (e.g., 2024)")
@@ -1708,7 +2051,8 @@ def main():
     rpt.add_argument("--county", help="County for regional report")
     rpt.add_argument("--code", help="Company code for company-specific reports")
 
-    # Export command (improved with filters)
+# Export command (improved with filters)
+def _build_export(sub):
     exp = sub.add_parser("export", aliases=["ekspordi"], help="Export companies to CSV or JSON")
     exp.add_argument("output", help="Output file (.csv or .json)")
     exp.add_argument("--industry", help="Industry name filter")
@@ -1721,142 +2065,169 @@ def main():
     exp.add_argument("--has-email", action="store_true"); exp.add_argument("--has-phone", action="store_true"); exp.add_argument("--has-website", action="store_true")
     exp.add_argument("--limit", type=int, help="Max companies to export")
 
-    args = parser.parse_args(); setup_logging(args.verbose)
+# Registration order is the order commands are listed in --help
+SUBPARSER_BUILDERS = {"sync": _build_sync, "merge": _build_merge, "enrich": _build_enrich, "stats": _build_stats,
+                      "search": _build_search, "find": _build_find, "analyze": _build_analyze, "person": _build_person,
+                      "group": _build_group, "report": _build_report, "export": _build_export}
+
+def _typed_command(argv):
+    """First CLI token naming a command, as typed (Estonian alias or English); "" if none comes before -h/--help."""
+    for a in argv:
+        if a in ("-h", "--help"): return ""
+        if a in CMD_ALIASES or a in SUBPARSER_BUILDERS: return a
+    return ""
+
+def _peek(it):
+    """(first item or None, iterator that still yields every item)."""
+    it = iter(it)
+    for first in it:
+        return first, chain((first,), it)
+    return None, it
+
+# ============================================================
+# Command handlers (one per subcommand, dispatched by canonical name)
+# ============================================================
+
+def _run_stats(reg, args, lang): display_stats(reg.db.get_stats(), lang=lang)
+def _run_sync(reg, args, lang): reg.sync(force=getattr(args, 'force', False))
+def _run_merge(reg, args, lang): reg.merge(force=getattr(args, 'force', False))
+def _run_enrich(reg, args, lang): reg.enrich(args.codes)
+
+def _run_search(reg, args, lang):
+    emtak = args.emtak
+    if args.industry:
+        emtak = resolve_industry(args.industry)
+        if not emtak: return
+    results = reg.db.search(term=args.term, person=args.person, location=args.location, status=args.status,
+                            limit=args.limit, emtak=emtak, founded_after=args.founded_after,
+                            founded_before=args.founded_before, legal_form=args.legal_form)
+    sections = ALL_DOSSIER_SECTIONS if not args.sections else frozenset(args.sections)
+    count, lbl = 0, UI_LABELS[lang]
+    if args.json:
+        # One JSON array and one highlighter pass for all matches, like find --json
+        to_en = args.translate or lang == "en"
+        items = [translate_item(item, to_en=to_en) for item in results]; count = len(items)
+        if items: print_json(items)
+    else:
+        with console:  # buffer every dossier and write once on exit
+            for count, item in enumerate(results, 1): display_company(item, sections=sections, lang=lang)
+    if count == 0: console.print(f"[warning]{lbl['no_results']}[/warning]")
+    else: console.print(f"\n[success]{lbl['results_found']}: {count}[/success]")
+
+def _run_find(reg, args, lang):
+    emtak = None
+    if args.industry:
+        emtak = resolve_industry(args.industry)
+        if not emtak: return
+    results = reg.db.search(term=args.query, location=args.location, status=args.status,
+                            limit=args.limit, emtak=emtak, founded_after=args.founded_after,
+                            founded_before=args.founded_before, legal_form=args.legal_form,
+                            min_capital=args.min_capital, max_capital=args.max_capital,
+                            has_email=args.has_email, has_phone=args.has_phone, has_website=args.has_website,
+                            min_employees=args.min_employees, max_employees=args.max_employees, growing=args.growing)
+    if args.csv:
+        # Already filtered and limited in SQL; write the stream without re-running the query
+        export_csv(reg.db, args.csv, lang=lang, rows=results)
+    elif args.json:
+        print_json([translate_item(i, to_en=(lang=="en")) for i in results])
+    else:
+        # Zero matches short-circuit before any table or buffered console is set up
+        first, results = _peek(results)
+        if first is None: console.print(f"[warning]{UI_LABELS[lang]['no_results']}[/warning]")
+        elif args.full:
+            with console:
+                for item in results: display_company(item, lang=lang)
+        else: display_company_summary(results, lang=lang)
+
+def _run_analyze(reg, args, lang):
+    emtak = args.emtak
+    if args.industry:
+        emtak = resolve_industry(args.industry)
+        if not emtak: return
+    results = reg.db.analyze(by=args.by, emtak=emtak, location=args.location, status=args.status,
+                             legal_form=args.legal_form, founded_after=args.founded_after,
+                             founded_before=args.founded_before, top=args.top)
+    if args.json:
+        print_json([{"group": g, "count": c} for g, c in results])
+    else:
+        display_analysis(results, by=args.by, lang=lang)
+
+def _run_person(reg, args, lang):
+    if args.network:
+        results = reg.db.person_network(name=args.name, id_code=args.id_code)
+        display_person_network(results, name=args.name or args.id_code, lang=lang)
+    else:
+        results = reg.db.search_persons(name=args.name, id_code=args.id_code, role=args.role,
+                                        source=args.source, company_code=args.code, limit=args.limit)
+        display_person_results(results, lang=lang)
+
+def _run_group(reg, args, lang):
+    group_data = reg.db.find_group(args.code, direction=args.direction, max_depth=args.depth)
+    display_group_tree(group_data, lang=lang)
+
+def _run_report(reg, args, lang):
+    cmd_report(reg.db, args.type, lang=lang, period=args.period,
+               industry=args.industry, location=args.location, county=args.county,
+               code=getattr(args, 'code', None))
+
+def _run_export(reg, args, lang):
+    output = Path(args.output)
+    emtak = None
+    if args.industry:
+        emtak = resolve_industry(args.industry)
+        if not emtak: return
+    if output.suffix.lower() == '.csv':
+        export_csv(reg.db, output, lang=lang, emtak=emtak, location=args.location,
+                   status=args.status, legal_form=args.legal_form,
+                   founded_after=args.founded_after, founded_before=args.founded_before,
+                   min_employees=args.min_employees, max_employees=args.max_employees, limit=args.limit,
+                   min_capital=args.min_capital, max_capital=args.max_capital,
+                   has_email=args.has_email, has_phone=args.has_phone, has_website=args.has_website)
+    else:
+        # JSON export (original behavior with filters)
+        results = reg.db.search(emtak=emtak, location=args.location, status=args.status,
+                                legal_form=args.legal_form, founded_after=args.founded_after,
+                                founded_before=args.founded_before, limit=args.limit,
+                                min_capital=args.min_capital, max_capital=args.max_capital,
+                                has_email=args.has_email, has_phone=args.has_phone, has_website=args.has_website,
+                                min_employees=args.min_employees, max_employees=args.max_employees)
+        with open(output, 'w', encoding='utf-8') as f:
+            count = dump_json_array((translate_item(i, to_en=(lang=="en")) for i in results), f)
+        console.print(f"[success]Exported {count} companies to {output}[/success]")
+
+# Keyed like SUBPARSER_BUILDERS; Estonian aliases are mapped through CMD_ALIASES first
+COMMAND_HANDLERS = {"sync": _run_sync, "merge": _run_merge, "enrich": _run_enrich, "stats": _run_stats,
+                    "search": _run_search, "find": _run_find, "analyze": _run_analyze, "person": _run_person,
+                    "group": _run_group, "report": _run_report, "export": _run_export}
 
-    # Language detection
-    et_cmds = ["otsi", "rikasta", "ühenda", "sünk", "ekspordi", "analüüs", "statistika", "leia", "aruanne", "isik", "kontsern"]
-    en_cmds = ["search", "enrich", "merge", "sync", "export", "analyze", "stats", "find", "report", "person", "group"]
-    cmd_typed = sys.argv[1] if len(sys.argv) > 1 else ""
+def main():
+    parser = argparse.ArgumentParser(description="Estonian Registry CLI - Business Intelligence for Estonian Companies")
+    parser.add_argument("--no-db", action="store_true")
+    parser.add_argument("--en", action="store_true"); parser.add_argument("--ee", action="store_true"); parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("--list-industries", action="store_true", help="Show all available industry names")
+    sub = parser.add_subparsers(dest="cmd")
+
+    # Only the invoked command's subparser is built; help, typos and bare calls get all of them
+    argv = sys.argv[1:]; cmd = _typed_command(argv); cmd = CMD_ALIASES.get(cmd, cmd)
+    for build in ([SUBPARSER_BUILDERS[cmd]] if cmd else SUBPARSER_BUILDERS.values()): build(sub)
+
+    args = parser.parse_args(argv); setup_logging(args.verbose)
+
+    # Language detection looks at the first token only, so a leading option (-v stats, --no-db find) means Estonian
+    cmd_typed = argv[0] if argv else ""
     if args.en: lang = "en"
     elif args.ee: lang = "et"
-    else: lang = "et" if (cmd_typed in et_cmds or (cmd_typed not in en_cmds and cmd_typed != "")) else "en"
+    else: lang = "et" if (cmd_typed in ET_CMDS or (cmd_typed not in EN_CMDS and cmd_typed != "")) else "en"
 
     # --list-industries (no DB needed)
     if args.list_industries:
         display_industry_list(lang=lang); return
+    # A bare call has nothing to run: don't create the data directory or open (and migrate) the database for it
+    if not args.cmd:
+        parser.print_help(); return
 
     reg = EstonianRegistry(use_db=not args.no_db)
 
-    if args.cmd in ["stats", "statistika"]:
-        display_stats(reg.db.get_stats(), lang=lang)
-
-    elif args.cmd in ["sync", "sünk"]: reg.sync(force=getattr(args, 'force', False))
-    elif args.cmd in ["merge", "ühenda"]: reg.merge(force=getattr(args, 'force', False))
-    elif args.cmd in ["enrich", "rikasta"]: reg.enrich(args.codes)
-
-    elif args.cmd in ["search", "otsi"]:
-        emtak = args.emtak
-        if args.industry:
-            emtak = resolve_industry(args.industry)
-            if not emtak: return
-        results = reg.db.search(term=args.term, person=args.person, location=args.location, status=args.status,
-                                limit=args.limit, emtak=emtak, founded_after=args.founded_after,
-                                founded_before=args.founded_before, legal_form=args.legal_form)
-        sections, count = args.sections or ["all"], 0
-        for item in results:
-            count += 1
-            if args.json: console.print(Syntax(json.dumps(translate_item(item, to_en=(args.translate or lang=="en")), indent=2, ensure_ascii=False), "json", theme="monokai"))
-            else: display_company(item, sections=sections, lang=lang)
-        if count == 0: console.print(f"[warning]{UI_LABELS[lang]['no_results']}[/warning]")
-        else: console.print(f"\n[success]{UI_LABELS[lang]['results_found']}: {count}[/success]")
-
-    elif args.cmd in ["find", "leia"]:
-        emtak = None
-        if args.industry:
-            emtak = resolve_industry(args.industry)
-            if not emtak: return
-        # Use a higher limit for post-filtering by employees
-        fetch_limit = args.limit
-        if args.min_employees or args.max_employees or args.growing:
-            fetch_limit = None  # Fetch all, filter in Python
-        results = reg.db.search(term=args.query, location=args.location, status=args.status,
-                                limit=fetch_limit, emtak=emtak, founded_after=args.founded_after,
-                                founded_before=args.founded_before, legal_form=args.legal_form,
-                                min_capital=args.min_capital, max_capital=args.max_capital,
-                                has_email=args.has_email, has_phone=args.has_phone, has_website=args.has_website)
-        if args.min_employees or args.max_employees:
-            results = filter_by_employees(results, args.min_employees, args.max_employees)
-        if args.growing:
-            results = filter_growing(results)
-        # Apply limit after employee filter
-        def limited(gen, n):
-            for i, item in enumerate(gen):
-                if n and i >= n: break
-                yield item
-        results = limited(results, args.limit)
-        if args.csv:
-            # Collect results and export
-            items = list(results)
-            export_csv(reg.db, args.csv, lang=lang, emtak=emtak, location=args.location,
-                       status=args.status, legal_form=args.legal_form,
-                       founded_after=args.founded_after, founded_before=args.founded_before,
-                       min_employees=args.min_employees, max_employees=args.max_employees, limit=args.limit)
-        elif args.json:
-            items = list(results)
-            console.print(Syntax(json.dumps([translate_item(i, to_en=(lang=="en")) for i in items], indent=2, ensure_ascii=False), "json", theme="monokai"))
-        elif args.full:
-            count = 0
-            for item in results:
-                count += 1; display_company(item, lang=lang)
-            if count == 0: console.print(f"[warning]{UI_LABELS[lang]['no_results']}[/warning]")
-        else:
-            display_company_summary(results, lang=lang)
-
-    elif args.cmd in ["analyze", "analüüs"]:
-        emtak = args.emtak
-        if args.industry:
-            emtak = resolve_industry(args.industry)
-            if not emtak: return
-        results = reg.db.analyze(by=args.by, emtak=emtak, location=args.location, status=args.status,
-                                 legal_form=args.legal_form, founded_after=args.founded_after,
-                                 founded_before=args.founded_before, top=args.top)
-        if args.json:
-            console.print(Syntax(json.dumps([{"group": g, "count": c} for g, c in results], indent=2, ensure_ascii=False), "json", theme="monokai"))
-        else:
-            display_analysis(results, by=args.by, lang=lang)
-
-    elif args.cmd in ["person", "isik"]:
-        if args.network:
-            results = reg.db.person_network(name=args.name, id_code=args.id_code)
-            display_person_network(results, name=args.name or args.id_code, lang=lang)
-        else:
-            results = reg.db.search_persons(name=args.name, id_code=args.id_code, role=args.role,
-                                            source=args.source, company_code=args.code, limit=args.limit)
-            display_person_results(results, lang=lang)
-
-    elif args.cmd in ["group", "kontsern"]:
-        group_data = reg.db.find_group(args.code, direction=args.direction, max_depth=args.depth)
-        display_group_tree(group_data, lang=lang)
-
-    elif args.cmd in ["report", "aruanne"]:
-        cmd_report(reg.db, args.type, lang=lang, period=args.period,
-                   industry=args.industry, location=args.location, county=args.county,
-                   code=getattr(args, 'code', None))
-
-    elif args.cmd in ["export", "ekspordi"]:
-        output = Path(args.output)
-        emtak = None
-        if args.industry:
-            emtak = resolve_industry(args.industry)
-            if not emtak: return
-        if output.suffix.lower() == '.csv':
-            export_csv(reg.db, output, lang=lang, emtak=emtak, location=args.location,
-                       status=args.status, legal_form=args.legal_form,
-                       founded_after=args.founded_after, founded_before=args.founded_before,
-                       min_employees=args.min_employees, max_employees=args.max_employees, limit=args.limit,
-                       min_capital=args.min_capital, max_capital=args.max_capital,
-                       has_email=args.has_email, has_phone=args.has_phone, has_website=args.has_website)
-        else:
-            # JSON export (original behavior with filters)
-            results = reg.db.search(emtak=emtak, location=args.location, status=args.status,
-                                    legal_form=args.legal_form, founded_after=args.founded_after,
-                                    founded_before=args.founded_before, limit=args.limit,
-                                    min_capital=args.min_capital, max_capital=args.max_capital,
-                                    has_email=args.has_email, has_phone=args.has_phone, has_website=args.has_website)
-            if args.min_employees or args.max_employees:
-                results = filter_by_employees(results, args.min_employees, args.max_employees)
-            data = [translate_item(i, to_en=(lang=="en")) for i in results]
-            with open(output, 'w', encoding='utf-8') as f: json.dump(data, f, ensure_ascii=False, indent=2)
-            console.print(f"[success]Exported {len(data)} companies to {output}[/success]")
+    COMMAND_HANDLERS[CMD_ALIASES.get(args.cmd, args.cmd)](reg, args, lang)
 
 if __name__ == "__main__": main()
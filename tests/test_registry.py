@@ -2,7 +2,7 @@ import pytest
 import json
 import sqlite3
 from pathlib import Path
-from registry import EstonianRegistry, RegistryDB, translate_item, UI_LABELS
+from registry import EstonianRegistry, RegistryDB, SQLiteBackend, translate_item, UI_LABELS, get_latest_employees
 
 def test_translation_logic():
     item = {
@@ -26,7 +26,6 @@ def test_registry_init(tmp_path):
     reg = EstonianRegistry(data_dir=str(data_dir), use_db=True)
     
     assert (data_dir / "downloads").exists()
-    assert (data_dir / "extracted").exists()
     assert reg.db is not None
     assert reg.db_path.exists()
 
@@ -72,4 +71,225 @@ def test_enrichment_storage(tmp_path):
     
     row = list(db.search(term="123"))[0]
     assert "enrichment" in row
-    assert row["enrichment"]["unmasked_ids"]["Test Person"] == "12345678901"
\ No newline at end of file
+    assert row["enrichment"]["unmasked_ids"]["Test Person"] == "12345678901"
+
+def test_populate_persons(tmp_path):
+    db = SQLiteBackend(tmp_path / "test_persons.db")
+
+    # Board members for many companies, plus one shareholder and one beneficiary
+    db.insert_batch_base([{"ariregistri_kood": i, "nimi": f"Company {i}"} for i in range(1, 61)])
+    db.update_batch_json("isikud", {i: [{"kaardile_kantud_isikud": [
+        {"eesnimi": "Mari", "nimi_arinimi": "Maasikas", "isiku_roll_tekstina": "Juhatuse liige"}]}] for i in range(1, 61)})
+    db.update_batch_json("osanikud", {1: [{"osanikud": [
+        {"nimi_arinimi": "Parent OÜ", "isikukood_registrikood": 10002, "osaluse_protsent": "50.5", "osamaksu_summa": "1250", "valuuta": "EUR"}]}]})
+    # Text that is not a whole number is NULL, not its numeric prefix
+    db.update_batch_json("osanikud", {2: [{"osanikud": [
+        {"nimi_arinimi": "Other OÜ", "osaluse_protsent": "50,5", "osamaksu_summa": "1 250", "osaluse_suurus": "abc"},
+        {"nimi_arinimi": "Third OÜ", "osaluse_protsent": "abc", "osamaksu_summa": 0, "osaluse_suurus": 300}]}]})
+    db.update_batch_json("kasusaajad", {1: [{"kasusaajad": [
+        {"eesnimi": "John", "nimi": "Doe", "aadress_riik_tekstina": "Eesti"}]}]})
+    db.populate_persons()
+
+    assert db.conn.execute("SELECT COUNT(*) FROM persons WHERE source = 'board'").fetchone()[0] == 60
+    sh = db.search_persons(source="shareholder", company_code=1)
+    assert len(sh) == 1
+    assert sh[0]["id_code"] == "10002"
+    assert sh[0]["ownership_pct"] == 50.5
+    assert sh[0]["contribution_amount"] == 1250.0
+    bad = {p["full_name"]: (p["ownership_pct"], p["contribution_amount"]) for p in db.search_persons(source="shareholder", company_code=2)}
+    assert bad == {"Other OÜ": (None, None), "Third OÜ": (None, 300.0)}
+    ben = db.search_persons(source="beneficiary")
+    assert ben[0]["full_name"] == "John Doe"
+    assert ben[0]["country"] == "Eesti"
+
+    # person= also matches through the persons table, so a full name spread over two JSON fields matches
+    assert [c["ariregistri_kood"] for c in db.search(person="John Doe")] == [1]
+    assert [c["ariregistri_kood"] for c in db.search(person="10002")] == [1]
+    # Board members merged under their own key are not in persons but are still found once persons has rows
+    db.update_batch_json("kaardile_kantud_isikud", {2: [{"eesnimi": "Tony", "nimi_arinimi": "Benoy", "isikukood_registrikood": "38001010000"}]})
+    assert [c["ariregistri_kood"] for c in db.search(person="Benoy")] == [2]
+    assert [c["ariregistri_kood"] for c in db.search(person="38001010000")] == [2]
+
+def test_employee_helpers():
+    def company(*reports):
+        return {"yldandmed": {"info_majandusaasta_aruannetest": [
+            {"majandusaasta_perioodi_lopp_kpv": d, "tootajate_arv": e} for d, e in reports]}}
+
+    growing = company(("2022-12-31", 5), ("2023-12-31", "8"), ("2021-12-31", 9))
+    shrinking = company(("2023-12-31", 3), ("2022-12-31", 4), ("2024-12-31", None))
+
+    assert get_latest_employees(growing) == 8
+    assert get_latest_employees(shrinking) == 3
+    assert get_latest_employees(company()) is None
+    assert SQLiteBackend._extract_employees(growing) == (8, 5)
+    assert SQLiteBackend._extract_employees(shrinking) == (3, 4)
+
+def test_search_employee_filters(tmp_path):
+    db = SQLiteBackend(tmp_path / "test_employees.db")
+    reports = {1: [("2022-12-31", 5), ("2023-12-31", 8)], 2: [("2022-12-31", 4), ("2023-12-31", 3)], 3: []}
+    db.insert_batch_base([{"ariregistri_kood": c, "nimi": f"Company {c}"} for c in reports])
+    db.update_batch_general([{"ariregistri_kood": c, "yldandmed": {"info_majandusaasta_aruannetest": [
+        {"majandusaasta_perioodi_lopp_kpv": d, "tootajate_arv": e} for d, e in r]}} for c, r in reports.items()])
+
+    codes = lambda **kw: sorted(c["ariregistri_kood"] for c in db.search(**kw))
+    assert codes(min_employees=5) == [1]
+    assert codes(max_employees=5) == [2, 3]
+    assert codes(growing=True) == [1]
+    # A zero bound on its own filters nothing, as before the filter moved into SQL
+    assert codes(min_employees=0) == [1, 2, 3]
+    assert codes(max_employees=0) == [1, 2, 3]
+    # Code order even when the employee index drives the query (company 2 has fewer employees than company 1)
+    assert [c["ariregistri_kood"] for c in db.search(min_employees=2)] == [1, 2]
+    assert [c["ariregistri_kood"] for c in db.search(min_employees=2, limit=1)] == [1]
+
+    # A database from before employee_prev existed gets it filled when reopened
+    db.conn.execute("ALTER TABLE companies DROP COLUMN employee_prev"); db.conn.close()
+    db = SQLiteBackend(tmp_path / "test_employees.db")
+    assert codes(growing=True) == [1]
+
+def test_search_name_index(tmp_path):
+    db = SQLiteBackend(tmp_path / "test_fts.db")
+    db.insert_batch_base([{"ariregistri_kood": 1, "nimi": "Tarkvara Arendus OÜ"}, {"ariregistri_kood": 2, "nimi": "Metsa Puit AS"}])
+    db.update_enrichment(1, {"pages": 1})
+    # Re-import: company 2 is renamed, company 1 is unchanged and keeps its enrichment
+    db.insert_batch_base([{"ariregistri_kood": 2, "nimi": "Jõe Ehitus AS"}, {"ariregistri_kood": 1, "nimi": "Tarkvara Arendus OÜ"}])
+
+    assert [c["nimi"] for c in db.search(term="arendus")] == ["Tarkvara Arendus OÜ"]
+    assert list(db.search(term="Metsa")) == []
+    assert [c["ariregistri_kood"] for c in db.search(term="Jõe Ehi")] == [2]
+    assert next(db.search(term="1"))["enrichment"] == {"pages": 1}
+
+    # After a merge, re-importing the same base row is still a no-op: merged JSON and derived columns are kept
+    db.update_batch_general([{"ariregistri_kood": 1, "yldandmed": {"sidevahendid": [{"liik_tekstina": "E-posti aadress", "sisu": "info@tarkvara.ee"}]}}])
+    changes = db.conn.total_changes
+    db.insert_batch_base([{"ariregistri_kood": 1, "nimi": "Tarkvara Arendus OÜ"}])
+    assert db.conn.total_changes == changes
+    assert [c["ariregistri_kood"] for c in db.search(has_email=True)] == [1]
+
+def test_county_stats_use_covering_index(tmp_path):
+    db = SQLiteBackend(tmp_path / "test_plan.db")
+    plan = [r[3] for r in db.conn.execute("EXPLAIN QUERY PLAN SELECT maakond, COUNT(*) FROM companies WHERE maakond IS NOT NULL GROUP BY maakond")]
+    assert any("COVERING INDEX idx_maakond" in step for step in plan)
+
+def test_merge_keeps_indexes_for_json_only_files(tmp_path):
+    import zipfile
+    reg = EstonianRegistry(data_dir=str(tmp_path / "data"))
+    reg.db.insert_batch_base([{"ariregistri_kood": 1, "nimi": "Alpha OÜ"}])
+    with zipfile.ZipFile(reg.download_dir / "ettevotja_rekvisiidid__osanikud.json.zip", "w") as zf:
+        zf.writestr("osanikud.json", json.dumps([{"ariregistri_kood": 1, "osanikud": [{"nimi_arinimi": "Parent OÜ"}]}]))
+    statements = []
+    reg.db.conn.set_trace_callback(statements.append)
+    reg.merge(parallel=False)
+
+    # Only full_data changes, so the indexes are maintained instead of dropped and rebuilt
+    assert not [s for s in statements if s.startswith("DROP INDEX")]
+    assert next(reg.db.search(term="1"))["osanikud"] == [[{"nimi_arinimi": "Parent OÜ"}]]
+
+def _write_registry_zips(download_dir):
+    import zipfile
+    def write(name, text):
+        with zipfile.ZipFile(download_dir / name, "w") as zf: zf.writestr(name.replace(".zip", ""), text)
+    write("ettevotja_rekvisiidid__lihtandmed.csv.zip", "ariregistri_kood;nimi;ettevotja_staatus_tekstina\n" +
+          "".join(f"{c};Company {c} OÜ;Registrisse kantud\n" for c in range(1, 8)))
+    write("ettevotja_rekvisiidid__yldandmed.json.zip", json.dumps([{"ariregistri_kood": str(c), "yldandmed": {
+        "sidevahendid": [{"liik_tekstina": "E-posti aadress", "sisu": f"info@{c}.ee"}],
+        "kapitalid": [{"kapitali_suurus": "2500", "kapitali_valuuta": "EUR", "algus_kpv": "2020-01-01"}]}} for c in range(1, 8)]))
+    write("ettevotja_rekvisiidid__osanikud.json.zip", json.dumps([{"ariregistri_kood": c, "osanikud": [
+        {"eesnimi": "Mari", "nimi_arinimi": f"Maasikas {c}", "osaluse_protsent": "100"}]} for c in (2, 3, 3, 5)]))
+
+def _kill_self(*args):
+    import os, signal
+    os.kill(os.getpid(), signal.SIGKILL)
+
+def test_merge_parallel_matches_serial(tmp_path):
+    dumps = []
+    for parallel in (False, True):
+        reg = EstonianRegistry(data_dir=str(tmp_path / str(parallel)), chunk_size=2)
+        _write_registry_zips(reg.download_dir)
+        reg.merge(force=True, parallel=parallel)
+        dumps.append([tuple(r) for r in reg.db.conn.execute("SELECT * FROM companies ORDER BY code")] +
+                     [tuple(r)[1:] for r in reg.db.conn.execute("SELECT * FROM persons ORDER BY company_code, full_name")])
+
+    assert dumps[0] == dumps[1]
+    assert [c["ariregistri_kood"] for c in reg.db.search(has_email=True, min_capital=2500)] == list(range(1, 8))
+    # A company's rows are never split across batches, even with chunk_size=2
+    assert len(next(reg.db.search(term="3"))["osanikud"]) == 2
+
+def test_merge_raises_when_parser_is_killed(tmp_path, monkeypatch):
+    import registry
+    reg = EstonianRegistry(data_dir=str(tmp_path / "data"))
+    _write_registry_zips(reg.download_dir)
+    monkeypatch.setattr(registry, "_parse_worker", _kill_self)
+    monkeypatch.setattr(registry, "PARSER_POLL_SECONDS", 0.1)
+
+    with pytest.raises(RuntimeError, match="exited with code -9"):
+        reg.merge(parallel=True)
+    # The CSV was applied in-process; the JSON file whose parser died is not marked done
+    assert reg.db.is_file_processed("ettevotja_rekvisiidid__lihtandmed.csv.zip")
+    assert not reg.db.is_file_processed("ettevotja_rekvisiidid__yldandmed.json.zip")
+
+def test_display_company_resolves_unmasked_ids():
+    import registry
+    people = [("Mari", "Maasikas"), ("Jaan", "Kask"), ("Peeter", "Paju"), ("Anne", "Tamm"), ("Toomas", "Tamm")]
+    item = {"ariregistri_kood": 1, "nimi": "Alpha OÜ",
+            "osanikud": [{"osanikud": [{"eesnimi": f, "nimi_arinimi": l, "isikukood_hash": "f00dbabe1234"} for f, l in people]}],
+            # Exact (any case), longer name, shorter name and a name sharing one token
+            "enrichment": {"unmasked_ids": {"MARI MAASIKAS": "49001010001", "jaan kask jr": "39001010002",
+                                            "peeter": "39001010003", "liis anne tamm": "49001010004"}}}
+    width = registry.console.width; registry.console.width = 200
+    try:
+        with registry.console.capture() as cap: registry.display_company(item, sections=["ownership"])
+    finally: registry.console.width = width
+    rows = {line.split("│")[1].strip(): line.split("│")[2].strip() for line in cap.get().splitlines() if line.count("│") > 2}
+
+    assert rows["Mari Maasikas"] == "49001010001 (unmasked)"
+    assert rows["Jaan Kask"] == "39001010002 (unmasked)"
+    assert rows["Peeter Paju"] == "39001010003 (unmasked)"
+    assert rows["Anne Tamm"] == "49001010004 (unmasked)"
+    assert rows["Toomas Tamm"] == "Hash: f00dbabe..."
+
+def test_export_csv(tmp_path):
+    from registry import export_csv
+    item = {"ariregistri_kood": 1, "nimi": "Alpha OÜ", "ettevotja_oiguslik_vorm": "Osaühing", "kmkr_nr": "EE100",
+            "asukoha_ehak_tekstina": "Tartu linn, Tartu maakond",
+            "yldandmed": {"staatus_tekstina": "Registrisse kantud", "esmaregistreerimise_kpv": "01.01.2020",
+                          "sidevahendid": [{"liik_tekstina": "Mobiiltelefon", "sisu": "+372 5555"},
+                                           {"liik_tekstina": "E-posti aadress", "sisu": "info@alpha.ee"}],
+                          "teatatud_tegevusalad": [{"emtak_kood": "4711", "emtak_tekstina": "Jaekaubandus"},
+                                                   {"emtak_kood": "62011", "emtak_tekstina": "Programmeerimine", "on_pohitegevusala": True}],
+                          "kapitalid": [{"kapitali_suurus": "2500", "kapitali_valuuta": "EUR", "algus_kpv": "2020-01-01"}],
+                          "info_majandusaasta_aruannetest": [{"majandusaasta_perioodi_lopp_kpv": "2023-12-31", "tootajate_arv": 7}]}}
+    out = tmp_path / "out.csv"
+    export_csv(None, out, rows=[item, {"ariregistri_kood": 2, "nimi": "Beta AS"}])
+
+    raw = out.read_bytes()
+    assert raw.startswith(b"\xef\xbb\xbf")
+    lines = raw[3:].decode().splitlines()
+    assert lines[0].startswith("code,name,status,county,city")
+    assert lines[1] == ("1,Alpha OÜ,Registrisse kantud,Tartu maakond,Tartu linn,Osaühing,01.01.2020,62011,Programmeerimine,"
+                        "7,2500.0,EUR,EE100,info@alpha.ee,+372 5555,")
+    assert lines[2] == "2,Beta AS,,,,,,,,,,,,,,"
+
+def test_dump_json_array():
+    import io
+    from registry import dump_json_array, dumps_pretty
+    for items in ([], [{"a": 1}], [{"a": [1, {"b": "ä"}]}, {"c": None}]):
+        buf = io.StringIO()
+        assert dump_json_array(iter(items), buf) == len(items)
+        assert buf.getvalue() == dumps_pretty(items)
+
+def test_compact_json_on_both_paths(monkeypatch):
+    import importlib, sys, registry
+    item = {"ariregistri_kood": 1, "nimi": "Õun & Pirn OÜ", "osaluse_protsent": 50.5, "osamaksu_summa": 2500.0,
+            "lopp_kpv": None, "isikud": [{"isiku_roll_tekstina": "Juhatuse liige"}]}
+    expected = ('{"ariregistri_kood":1,"nimi":"Õun & Pirn OÜ","osaluse_protsent":50.5,"osamaksu_summa":2500.0,'
+                '"lopp_kpv":null,"isikud":[{"isiku_roll_tekstina":"Juhatuse liige"}]}')
+    # Stdlib fallback (orjson hidden), then whatever this environment has
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    try:
+        fallback = importlib.reload(registry)
+        assert fallback.orjson is None
+        assert fallback._compact_json(item) == expected
+    finally: monkeypatch.undo(); fast = importlib.reload(registry)
+    assert fast._compact_json(item) == expected
+    assert fast._json_loads(expected) == item